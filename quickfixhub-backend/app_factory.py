@@ -0,0 +1,167 @@
+import os
+
+from flask import Flask
+
+from config import Config
+from extensions import login_manager
+from db.repository import create_repository, get_repository, set_repository
+from models.user import User
+from services.events import create_event_bus, get_event_bus, set_event_bus
+from services.notifications import create_dispatcher, get_dispatcher, set_dispatcher
+from utils.json_provider import FastJSONProvider
+from utils.static_assets import AssetManifest
+
+
+# ----------------------------------
+# Environments
+# ----------------------------------
+#   "local" → app.py: memory storage, printed notifications,
+#             CORS for the Vite dev server
+#   "aws"   → aws_app.py: DynamoDB + SNS, serves the React build
+#
+# Importing this module (or any route / service / db module)
+# creates nothing: storage, AWS clients, the hashing pool and
+# the expiry worker are all set up by create_app() or on first use.
+
+ENV_DEFAULTS = {
+    "local": {
+        "STORAGE_BACKEND": os.getenv("STORAGE_BACKEND", "memory"),
+        "NOTIFICATION_SINK": os.getenv("NOTIFICATION_SINK", "log"),
+        "METRICS_ENABLED": os.getenv("METRICS_ENABLED", "1") == "1",
+    },
+    "aws": {},
+}
+
+FRONTEND_DIST = "frontend_dist"
+
+
+def create_app(env="local", overrides=None, start_background=True):
+    """
+    Builds a configured Flask app.
+
+    overrides          → extra app.config values (tests / benchmarks)
+    start_background   → start the hashing pool and expiry worker
+    """
+    if env not in ENV_DEFAULTS:
+        raise ValueError(f"Unknown environment: {env}")
+
+    # AWS serves the React build from an in-memory manifest
+    # (utils/static_assets.py) instead of Flask's static route
+    app = Flask(__name__, static_folder=None if env == "aws" else "static")
+
+    app.config.from_object(Config)
+    app.config.update(ENV_DEFAULTS[env])
+    app.config.update(overrides or {})
+    app.config["ENV_NAME"] = env
+
+    app.json = FastJSONProvider(app, app.config["JSON_ENCODER"])
+
+    # ----------------------------------
+    # Storage / notifications / events
+    # ----------------------------------
+    set_repository(create_repository(app.config["STORAGE_BACKEND"]))
+    set_dispatcher(create_dispatcher(app.config["NOTIFICATION_SINK"]))
+    set_event_bus(create_event_bus(app.config["EVENT_FANOUT"]))
+
+    # ----------------------------------
+    # Extensions
+    # ----------------------------------
+    if env == "local":
+        from flask_cors import CORS
+
+        CORS(
+            app,
+            supports_credentials=True,
+            origins=["http://localhost:8080"]
+        )
+
+    login_manager.init_app(app)
+    login_manager.user_loader(load_user)
+
+    # ----------------------------------
+    # API Blueprints
+    # ----------------------------------
+    from routes.auth import auth_bp
+    from routes.service_request import service_bp
+    from routes.provider import provider_bp
+
+    app.register_blueprint(auth_bp, url_prefix="/api/auth")
+    app.register_blueprint(service_bp, url_prefix="/api/service")
+    app.register_blueprint(provider_bp, url_prefix="/api/provider")
+
+    # Unauthenticated: only where METRICS_ENABLED (local default)
+    if app.config["METRICS_ENABLED"]:
+        from routes.metrics import metrics_bp
+        app.register_blueprint(metrics_bp, url_prefix="/api")
+
+    if app.config["DYNAMODB_DEBUG_HEADER"]:
+        from utils.metrics import add_debug_header
+        app.after_request(add_debug_header)
+
+    if env == "aws":
+        _register_aws_routes(app)
+    else:
+        _register_local_routes(app)
+
+    if start_background:
+        start_background_workers(app)
+
+    return app
+
+
+def start_background_workers(app):
+    from services.passwords import start_pool
+    from services.timeout_service import start_expiry_worker
+
+    # Fork the hashing pool before any background thread exists
+    start_pool()
+
+    if app.config["EXPIRY_WORKER_ENABLED"]:
+        start_expiry_worker()
+
+
+# ----------------------------------
+# Flask-Login user loader
+# ----------------------------------
+def load_user(user_id):
+    item = get_repository().get_user(user_id)
+    return User.from_item(item) if item else None
+
+
+# ----------------------------------
+# Environment-specific routes
+# ----------------------------------
+def _register_local_routes(app):
+
+    @app.route("/")
+    def health():
+        return {"status": "running"}
+
+
+def _register_aws_routes(app):
+    manifest = AssetManifest(os.path.join(app.root_path, FRONTEND_DIST))
+
+    @app.route("/api/health")
+    def api_health():
+        repo = get_repository()
+        return {
+            "status": "running",
+            "env": "aws",
+            "region": app.config["AWS_REGION"],
+            "cache": repo.cache_stats() if hasattr(repo, "cache_stats") else None,
+            "notifications": get_dispatcher().stats(),
+            "events": get_event_bus().stats(),
+            "static": manifest.stats()
+        }
+
+    # ----------------------------------
+    # Serve React (SPA)
+    # ----------------------------------
+    @app.route("/")
+    def serve_react():
+        return manifest.serve(manifest.index)
+
+    @app.route("/<path:path>")
+    def serve_static_or_react(path):
+        # React Router fallback for unknown paths
+        return manifest.serve(path)
@@ -0,0 +1,587 @@
+"""
+Endpoint benchmark with DynamoDB call-count budgets.
+
+Drives the real blueprints (auth_bp, service_bp, provider_bp)
+through the Flask test client against the in-process memory
+backend, seeded with realistic volumes. For every endpoint it
+records latency percentiles and the number of DynamoDB requests
+the same repository calls would make against the DynamoDB
+backend (see DYNAMODB_COST), then checks the worst case against
+BUDGETS. Exits 1 when any endpoint is over budget:
+
+    python benchmarks/endpoints.py
+    python benchmarks/endpoints.py --providers 1000 --requests 10000 -n 20
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SERVICE_TYPES = [
+    "plumbing", "electrical", "cleaning", "painting",
+    "carpentry", "hvac", "landscaping", "appliance",
+]
+
+# Providers and requests are spread around these cities
+CITIES = ["new york", "chicago", "houston", "seattle", "mumbai", "pune"]
+
+PASSWORD = "benchmark-password"
+
+# DynamoDB returns at most 1 MB per Query/Scan page,
+# BatchGetItem takes at most 100 keys
+PAGE_BYTES = 1024 * 1024
+BATCH_GET_KEYS = 100
+
+
+# ==========================================================
+# BUDGETS (max DynamoDB requests per call of the endpoint)
+# ==========================================================
+# Calibrated at the default volumes. None = reported but not
+# enforced (known hot spot).
+BUDGETS = {
+    "POST /api/auth/login": 2,
+    "GET /api/auth/me": 1,
+    # Request put, geohash cell + unlocated queries and a
+    # BatchGetItem load check, then (sparse trade) the service-type
+    # fallback query and its load check, the offer transaction
+    "POST /api/service/requests": 7,
+    # Change-version read (ETag) + one page of the user index
+    "GET /api/service/my-requests": 2,
+    # If-None-Match on an unchanged listing: the version read only
+    "GET /api/service/my-requests (304)": 1,
+    "GET /api/service/all?limit=100": 1,
+    "GET /api/service/all?limit=100&fields=summary": 1,
+    "POST /api/service/requests/<id>/cancel": 3,
+    "GET /api/provider/dashboard/summary": 1,
+    "GET /api/provider/jobs/available": 2,
+    "GET /api/provider/jobs/available?fields=summary": 2,
+    "GET /api/provider/jobs/available (304)": 1,
+    # Full table scan of ServiceRequests (list_requests_for_provider)
+    "GET /api/provider/jobs/my": None,
+    "GET /api/provider/jobs/my (304)": 1,
+    # Accept transaction + sibling offer query + batched expiry
+    "POST /api/provider/offers/<id>/accept": 3,
+    "POST /api/provider/offers/<id>/reject": 4,
+    "POST /api/provider/jobs/<id>/start": 2,
+    "POST /api/provider/jobs/<id>/complete": 3,
+}
+
+
+# ==========================================================
+# DYNAMODB COST MODEL
+# ==========================================================
+# Requests DynamoDBRepository makes for each repository method,
+# as (calls, items_scanned). Keep in step with db/dynamodb.py:
+# an unknown method fails the run.
+
+def _fixed(calls):
+    return lambda counter, args, result: (calls, 0)
+
+
+def _batch_get(counter, args, result):
+    return math.ceil(len(args[0]) / BATCH_GET_KEYS), 0
+
+
+def _query(counter, args, result):
+    return counter.pages(len(result)), len(result)
+
+
+def _query_cells(counter, args, result):
+    # One begins_with query per geohash cell
+    return len(args[1]) + counter.pages(len(result)) - 1, len(result)
+
+
+def _page(counter, args, result):
+    return 1, len(result[0])
+
+
+def _scan_requests(counter, args, result):
+    table_size = len(counter.inner.service_requests.items)
+    return counter.pages(table_size), table_size
+
+
+def _expiry_shards(counter, args, result):
+    from db.dynamodb import EXPIRY_INDEX_SHARDS
+    return EXPIRY_INDEX_SHARDS, len(result or [])
+
+
+DYNAMODB_COST = {
+    "get_user": _fixed(1),
+    "find_user_by_email": _fixed(2),          # email claim + user
+    "create_user": _fixed(1),                 # one transaction
+    "update_user": _fixed(1),
+    "delete_user": _fixed(3),
+    "get_provider_profile": _fixed(1),
+    "put_provider_profile": _fixed(2),        # read old types + transaction
+    "list_providers_for_service": _query,
+    "list_providers_near": _query_cells,
+    "get_provider_stats": _fixed(1),
+    "get_active_jobs": _batch_get,
+    "release_provider_slot": _fixed(1),
+    "get_request": _fixed(1),
+    "get_requests": _batch_get,
+    "put_request": _fixed(1),
+    "update_request": _fixed(1),
+    "page_requests": _page,
+    "list_requests_for_user": _query,
+    "page_requests_for_user": _page,
+    "list_requests_for_provider": _scan_requests,
+    "list_due_requests": _expiry_shards,
+    "next_offer_expiry": _expiry_shards,
+    "get_offer": _fixed(1),
+    "put_offer": _fixed(1),
+    "update_offer_status": _fixed(1),
+    "list_offers_for_request": _query,
+    "list_offers_for_provider": _query,
+    "transact_write": _fixed(1),
+    "accept_offer": _fixed(1),                # one transaction
+    "get_change_version": _fixed(1),
+}
+
+
+class DynamoCallCounter:
+    """
+    Sits between the cache and the memory backend and adds up the
+    DynamoDB requests the backend calls stand for.
+    """
+
+    def __init__(self, inner, item_bytes):
+        self.inner = inner
+        self.item_bytes = item_bytes
+        self.active = True
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.scanned = 0
+        self.methods = {}
+
+    def pages(self, items):
+        return max(1, math.ceil(items * self.item_bytes / PAGE_BYTES))
+
+    @contextmanager
+    def paused(self):
+        self.active = False
+        try:
+            yield
+        finally:
+            self.active = True
+
+    def __getattr__(self, name):
+        attr = getattr(self.inner, name)
+        if not callable(attr):
+            return attr
+
+        if name not in DYNAMODB_COST:
+            raise KeyError(f"No DynamoDB cost for repository method {name!r}")
+
+        def counted(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if self.active:
+                calls, scanned = DYNAMODB_COST[name](self, args, result)
+                self.calls += calls
+                self.scanned += scanned
+                self.methods[name] = self.methods.get(name, 0) + calls
+            return result
+
+        return counted
+
+
+# ==========================================================
+# SEEDING
+# ==========================================================
+def bench_address(label, rng):
+    """Street address with explicit coordinates near a seeded city."""
+    from utils.geo import CITY_COORDINATES
+
+    lat, lon = CITY_COORDINATES[rng.choice(CITIES)]
+    lat += rng.uniform(-0.3, 0.3)
+    lon += rng.uniform(-0.3, 0.3)
+    return f"{label} @ {lat:.5f},{lon:.5f}"
+
+
+def seed(repo, providers, homeowners, requests, password_hash, rng):
+    """Writes users, profiles, requests and offers straight to storage."""
+    from utils.geo import location_fields
+
+    created = "2026-01-01T00:00:00+00:00"
+    provider_ids = []
+    homeowner_ids = []
+
+    for i in range(providers):
+        user_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        repo.create_user({
+            "user_id": user_id,
+            "name": f"Provider {i}",
+            "email": f"provider{i}@bench.local",
+            "password_hash": password_hash,
+            "role": "provider",
+            "phone": "5550000000",
+            "created_at": created,
+        })
+        address = bench_address(f"{i} Provider Street", rng)
+        repo.put_provider_profile({
+            "provider_id": user_id,
+            "service_types": rng.sample(SERVICE_TYPES, 2),
+            "address": address,
+            **location_fields(address),
+            "is_verified": True,
+            "created_at": created,
+        })
+        provider_ids.append(user_id)
+
+    for i in range(homeowners):
+        user_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        repo.create_user({
+            "user_id": user_id,
+            "name": f"Homeowner {i}",
+            "email": f"home{i}@bench.local",
+            "password_hash": password_hash,
+            "role": "homeowner",
+            "phone": "5551111111",
+            "created_at": created,
+        })
+        homeowner_ids.append(user_id)
+
+    sample_item = None
+    for i in range(requests):
+        status = rng.choices(
+            ["completed", "cancelled", "expired", "offered", "accepted"],
+            weights=[70, 10, 10, 8, 2],
+        )[0]
+        request_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        item = {
+            "request_id": request_id,
+            "user_id": rng.choice(homeowner_ids),
+            "user_name": "Homeowner",
+            "user_email": "home@bench.local",
+            "user_phone": "5551111111",
+            "service_type": rng.choice(SERVICE_TYPES),
+            "description": "Kitchen sink is leaking under the cabinet",
+            "address": f"{i} Request Avenue, {rng.choice(CITIES).title()}",
+            "preferred_date": "2026-02-01",
+            "preferred_time": "morning",
+            "status": status,
+            "assigned_provider_id": None,
+            "offer_round": 1,
+            "offer_expires_at": None,
+            "created_at": created,
+            "updated_at": created,
+        }
+        if status in ("completed", "accepted"):
+            item["assigned_provider_id"] = rng.choice(provider_ids)
+        if status == "offered":
+            item["offer_expires_at"] = "2099-01-01T00:00:00+00:00"
+
+        repo.put_request(item)
+        sample_item = item
+
+        if status == "offered":
+            for provider_id in rng.sample(provider_ids, 3):
+                repo.put_offer({
+                    "request_id": request_id,
+                    "provider_id": provider_id,
+                    "status": "offered",
+                    "created_at": created,
+                    "summary": {k: item[k] for k in (
+                        "request_id", "user_name", "service_type",
+                        "description", "address", "preferred_date",
+                        "preferred_time", "created_at",
+                    )},
+                })
+
+    item_bytes = len(json.dumps(sample_item)) if sample_item else 400
+    return provider_ids, homeowner_ids, item_bytes
+
+
+# ==========================================================
+# SCENARIOS
+# ==========================================================
+class Bench:
+
+    def __init__(self, app, counter, repo, iterations):
+        self.app = app
+        self.counter = counter
+        self.repo = repo
+        self.iterations = iterations
+        self.clients = {}
+        self.results = {}
+
+    def client(self, email):
+        """A logged-in test client (login not counted)."""
+        if email not in self.clients:
+            with self.counter.paused():
+                client = self.app.test_client()
+                res = client.post("/api/auth/login", json={
+                    "email": email, "password": PASSWORD
+                })
+                assert res.status_code == 200, res.get_json()
+            self.clients[email] = client
+        return self.clients[email]
+
+    def provider_email(self, provider_id):
+        return self.repo.get_user(provider_id)["email"]
+
+    def measure(self, name, call, setup=None):
+        latencies = []
+        calls = []
+        scanned = []
+        sizes = []
+
+        for _ in range(self.iterations):
+            args = ()
+            if setup:
+                with self.counter.paused():
+                    args = setup()
+
+            self.counter.reset()
+            start = time.perf_counter()
+            res = call(*args)
+            latencies.append(time.perf_counter() - start)
+
+            assert res.status_code < 400, (name, res.status_code, res.get_json())
+            calls.append(self.counter.calls)
+            scanned.append(self.counter.scanned)
+            sizes.append(len(res.get_data()))
+
+        self.results[name] = (
+            sorted(latencies), max(calls), max(scanned), max(sizes)
+        )
+
+    def measure_not_modified(self, name, client, url):
+        """A poll carrying the ETag of the previous response."""
+        def call(etag):
+            res = client.get(url, headers={"If-None-Match": etag})
+            assert res.status_code == 304, (name, res.status_code)
+            return res
+
+        self.measure(
+            name,
+            call,
+            setup=lambda: (client.get(url).headers["ETag"],),
+        )
+
+    # ----------------------------------
+    # Helpers for write scenarios
+    # ----------------------------------
+    def new_request(self, home):
+        res = home.post("/api/service/requests", json={
+            "serviceType": random.choice(SERVICE_TYPES),
+            "description": "Benchmark request",
+            "address": bench_address("1 Bench Road", random),
+            "preferredDate": "2026-02-01",
+        })
+        return res.get_json()["request"]["id"]
+
+    def offered_client(self, request_id):
+        offers = self.repo.list_offers_for_request(request_id, status="offered")
+        return self.client(self.provider_email(offers[0]["provider_id"]))
+
+    def accepted_job(self, home):
+        request_id = self.new_request(home)
+        provider = self.offered_client(request_id)
+        provider.post(f"/api/provider/offers/{request_id}/accept")
+        return provider, request_id
+
+    # ----------------------------------
+    # Run
+    # ----------------------------------
+    def run(self, provider_ids, homeowner_ids):
+        home = self.client(
+            self.repo.get_user(homeowner_ids[0])["email"]
+        )
+        provider = self.client(self.provider_email(provider_ids[0]))
+
+        self.measure(
+            "POST /api/auth/login",
+            lambda: self.app.test_client().post("/api/auth/login", json={
+                "email": "home1@bench.local", "password": PASSWORD
+            }),
+        )
+        self.measure("GET /api/auth/me", lambda: provider.get("/api/auth/me"))
+
+        self.measure(
+            "POST /api/service/requests",
+            lambda: home.post("/api/service/requests", json={
+                "serviceType": random.choice(SERVICE_TYPES),
+                "description": "Benchmark request",
+                "address": bench_address("1 Bench Road", random),
+                "preferredDate": "2026-02-01",
+            }),
+        )
+        self.measure(
+            "GET /api/service/my-requests",
+            lambda: home.get("/api/service/my-requests"),
+        )
+        self.measure_not_modified(
+            "GET /api/service/my-requests (304)",
+            home, "/api/service/my-requests",
+        )
+        self.measure(
+            "GET /api/service/all?limit=100",
+            lambda: home.get("/api/service/all?limit=100"),
+        )
+        self.measure(
+            "GET /api/service/all?limit=100&fields=summary",
+            lambda: home.get("/api/service/all?limit=100&fields=summary"),
+        )
+        self.measure(
+            "POST /api/service/requests/<id>/cancel",
+            lambda rid: home.post(f"/api/service/requests/{rid}/cancel"),
+            setup=lambda: (self.new_request(home),),
+        )
+
+        self.measure(
+            "GET /api/provider/dashboard/summary",
+            lambda: provider.get("/api/provider/dashboard/summary"),
+        )
+        self.measure(
+            "GET /api/provider/jobs/available",
+            lambda: provider.get("/api/provider/jobs/available"),
+        )
+        self.measure(
+            "GET /api/provider/jobs/available?fields=summary",
+            lambda: provider.get("/api/provider/jobs/available?fields=summary"),
+        )
+        self.measure_not_modified(
+            "GET /api/provider/jobs/available (304)",
+            provider, "/api/provider/jobs/available",
+        )
+        self.measure(
+            "GET /api/provider/jobs/my",
+            lambda: provider.get("/api/provider/jobs/my"),
+        )
+        self.measure_not_modified(
+            "GET /api/provider/jobs/my (304)",
+            provider, "/api/provider/jobs/my",
+        )
+
+        def offered():
+            request_id = self.new_request(home)
+            return self.offered_client(request_id), request_id
+
+        self.measure(
+            "POST /api/provider/offers/<id>/accept",
+            lambda c, rid: c.post(f"/api/provider/offers/{rid}/accept"),
+            setup=offered,
+        )
+        self.measure(
+            "POST /api/provider/offers/<id>/reject",
+            lambda c, rid: c.post(f"/api/provider/offers/{rid}/reject"),
+            setup=offered,
+        )
+        self.measure(
+            "POST /api/provider/jobs/<id>/start",
+            lambda c, rid: c.post(f"/api/provider/jobs/{rid}/start"),
+            setup=lambda: self.accepted_job(home),
+        )
+        self.measure(
+            "POST /api/provider/jobs/<id>/complete",
+            lambda c, rid: c.post(f"/api/provider/jobs/{rid}/complete"),
+            setup=lambda: self.accepted_job(home),
+        )
+
+
+# ==========================================================
+# REPORT
+# ==========================================================
+def percentile(sorted_values, p):
+    index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index] * 1000
+
+
+def report(results):
+    over = []
+
+    print(
+        f"{'endpoint':<48} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'calls':>6} {'budget':>7} {'scanned':>9} {'bytes':>8}"
+    )
+
+    for name, (latencies, calls, scanned, size) in results.items():
+        budget = BUDGETS.get(name)
+        flag = ""
+        if budget is not None and calls > budget:
+            flag = "  OVER BUDGET"
+            over.append(name)
+        elif budget is None:
+            flag = "  (not enforced)"
+
+        print(
+            f"{name:<48} {percentile(latencies, 50):>8.2f} "
+            f"{percentile(latencies, 95):>8.2f} {percentile(latencies, 99):>8.2f} "
+            f"{calls:>6} {budget if budget is not None else '-':>7} "
+            f"{scanned:>9} {size:>8}{flag}"
+        )
+
+    return over
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--providers", type=int, default=10_000)
+    parser.add_argument("--homeowners", type=int, default=5_000)
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("-n", "--iterations", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+
+    from config import Config
+    Config.BCRYPT_LOG_ROUNDS = 4
+    Config.BCRYPT_POOL_SIZE = 0
+
+    from app_factory import create_app
+    from db.cache import CachedRepository
+    from db.memory import MemoryRepository
+    from db.repository import set_repository
+    from services.passwords import hash_password
+
+    app = create_app(
+        "local",
+        overrides={"STORAGE_BACKEND": "memory", "NOTIFICATION_SINK": "memory"},
+        start_background=False,
+    )
+
+    memory = MemoryRepository()
+
+    start = time.perf_counter()
+    provider_ids, homeowner_ids, item_bytes = seed(
+        memory,
+        args.providers,
+        args.homeowners,
+        args.requests,
+        hash_password(PASSWORD),
+        random.Random(args.seed),
+    )
+    print(
+        f"seeded {args.providers} providers, {args.homeowners} homeowners, "
+        f"{args.requests} requests in {time.perf_counter() - start:.1f}s "
+        f"(~{item_bytes} bytes/request)"
+    )
+
+    counter = DynamoCallCounter(memory, item_bytes)
+    repo = set_repository(CachedRepository(
+        counter, maxsize=Config.CACHE_MAXSIZE, ttl=Config.CACHE_TTL_SECONDS
+    ))
+
+    bench = Bench(app, counter, repo, args.iterations)
+    bench.run(provider_ids, homeowner_ids)
+
+    over = report(bench.results)
+    if over:
+        print(f"\n{len(over)} endpoint(s) over their DynamoDB call budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
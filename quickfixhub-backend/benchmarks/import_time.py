@@ -0,0 +1,115 @@
+"""
+Cold-start benchmark.
+
+For each target, runs a fresh interpreter with `-X importtime`
+several times and reports the median cumulative import time,
+the median wall time of the whole process, and the slowest
+imported modules (from the median run):
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --runs 10 --top 15
+
+Targets:
+    routes      import the blueprints only (must stay side-effect free)
+    factory     import app_factory (no app built)
+    local-app   create_app("local") without background workers
+    aws-app     create_app("aws") without background workers
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {
+    "routes": (
+        "import routes.auth, routes.service_request, routes.provider"
+    ),
+    "factory": "import app_factory",
+    "local-app": (
+        "from app_factory import create_app; "
+        "create_app('local', start_background=False)"
+    ),
+    "aws-app": (
+        "from app_factory import create_app; "
+        "create_app('aws', overrides={'NOTIFICATION_SINK': 'memory'}, "
+        "start_background=False)"
+    ),
+}
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us)] for every module imported."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # One separator space; further indentation marks nesting depth
+        name = name[1:].rstrip()
+        rows.append((name, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def run_once(code):
+    env = dict(os.environ)
+    # Never touch real AWS from a benchmark
+    env.setdefault("AWS_EC2_METADATA_DISABLED", "true")
+    env.setdefault("EXPIRY_WORKER_ENABLED", "0")
+
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - start
+
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    rows = parse_importtime(proc.stderr)
+    # Top-level imports are the ones without leading spaces
+    total_us = sum(
+        cumulative for name, _, cumulative in rows if not name.startswith(" ")
+    )
+    return total_us, wall, rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("targets", nargs="*", default=list(TARGETS))
+    args = parser.parse_args()
+
+    for target in args.targets:
+        results = sorted(
+            (run_once(TARGETS[target]) for _ in range(args.runs)),
+            key=lambda result: result[0],
+        )
+        total_us, _, rows = results[len(results) // 2]
+        wall = statistics.median(result[1] for result in results)
+
+        print(
+            f"{target:<10} imports {total_us / 1000:8.1f} ms   "
+            f"process {wall * 1000:8.1f} ms   "
+            f"({len(rows)} modules, median of {args.runs})"
+        )
+
+        slowest = sorted(rows, key=lambda row: row[1], reverse=True)
+        for name, self_us, cumulative_us in slowest[:args.top]:
+            print(
+                f"    {self_us / 1000:7.1f} ms self "
+                f"{cumulative_us / 1000:8.1f} ms cumulative  {name.strip()}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+JSON encoding microbenchmark for list responses.
+
+Encodes a list of service requests (default 10k, the size of a
+large /api/service/all or /jobs/my response) with:
+
+    flask-default   Flask's DefaultJSONProvider (stdlib, sorted keys)
+    stdlib          utils/json_provider.py, JSON_ENCODER=stdlib
+    orjson          utils/json_provider.py, JSON_ENCODER=orjson
+
+for both payload shapes: raw storage items (Decimal numbers,
+snake_case) and the API dicts the routes send (models' to_dict()).
+
+    python benchmarks/json_encoding.py
+    python benchmarks/json_encoding.py --items 50000 --repeat 20
+"""
+
+import argparse
+import os
+import sys
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10,
+                        help="encodes per encoder (best run is reported)")
+    return parser.parse_args()
+
+
+def request_items(count):
+    statuses = ["completed", "cancelled", "expired", "offered", "accepted"]
+    return [
+        {
+            "request_id": f"00000000-0000-4000-8000-{i:012d}",
+            "user_id": f"10000000-0000-4000-8000-{i % 5000:012d}",
+            "user_name": "Homeowner",
+            "user_email": "home@bench.local",
+            "user_phone": "5551111111",
+            "service_type": "plumbing",
+            "description": "Kitchen sink is leaking under the cabinet",
+            "address": f"{i} Request Avenue, Pune",
+            "lat": Decimal("18.520400"),
+            "lon": Decimal("73.856700"),
+            "geohash": "te7ud2",
+            "preferred_date": "2026-02-01",
+            "preferred_time": "morning",
+            "status": statuses[i % len(statuses)],
+            "assigned_provider_id": None,
+            "offer_round": Decimal(i % 3 + 1),
+            "offer_expires_at": None,
+            "created_at": "2026-01-01T00:00:00+00:00",
+            "updated_at": "2026-01-01T00:00:00+00:00",
+        }
+        for i in range(count)
+    ]
+
+
+def best_time(fn, repeat):
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = len(fn())
+        best = min(best, time.perf_counter() - start)
+    return best, size
+
+
+def encode_response(app, provider, payload):
+    with app.app_context():
+        return provider.response({"success": True, "requests": payload}).get_data()
+
+
+def main():
+    args = parse_args()
+
+    from flask import Flask
+    from flask.json.provider import DefaultJSONProvider
+
+    from models.service_request import ServiceRequest
+    from utils.json_provider import FastJSONProvider, orjson
+
+    app = Flask(__name__)
+    encoders = {
+        "flask-default": DefaultJSONProvider(app),
+        "stdlib": FastJSONProvider(app, "stdlib"),
+    }
+    if orjson is not None:
+        encoders["orjson"] = FastJSONProvider(app, "orjson")
+    else:
+        print("orjson not installed: skipping it")
+
+    items = request_items(args.items)
+
+    start = time.perf_counter()
+    api = [ServiceRequest.from_item(item).to_dict() for item in items]
+    convert = time.perf_counter() - start
+
+    payloads = {"storage items": items, "API dicts": api}
+
+    print(f"{args.items} requests, best of {args.repeat}")
+    print(f"model conversion (from_item + to_dict): {convert * 1000:.1f} ms\n")
+    print(f"{'payload':<15} {'encoder':<14} {'ms':>8} {'MB/s':>8} {'x default':>10}")
+
+    for payload_name, payload in payloads.items():
+        baseline = None
+        for name, provider in encoders.items():
+            elapsed, size = best_time(
+                lambda: encode_response(app, provider, payload),
+                args.repeat,
+            )
+            baseline = baseline or elapsed
+            print(
+                f"{payload_name:<15} {name:<14} {elapsed * 1000:>8.1f} "
+                f"{size / elapsed / 1e6:>8.1f} {baseline / elapsed:>9.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
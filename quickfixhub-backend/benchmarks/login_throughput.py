@@ -0,0 +1,118 @@
+"""
+Login throughput benchmark (logins/sec and logins/sec per core).
+
+Runs concurrent POST /api/auth/login calls against the local app
+(memory storage, no AWS) for each hashing pool size given:
+
+    python benchmarks/login_throughput.py
+    python benchmarks/login_throughput.py --rounds 12 --pool-sizes 0,2,4
+
+Pool size 0 hashes on the request threads (the old behaviour).
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=10,
+                        help="bcrypt work factor (default 10)")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--logins", type=int, default=200,
+                        help="logins per pool size")
+    parser.add_argument("--threads", type=int, default=max(4, cpus * 2),
+                        help="concurrent request threads")
+    parser.add_argument("--pool-sizes", default=f"0,{cpus}",
+                        help="comma-separated BCRYPT_POOL_SIZE values")
+    return parser.parse_args()
+
+
+def run(app, emails, logins, threads):
+    counter = iter(range(logins))
+    lock = threading.Lock()
+    failures = []
+
+    def worker():
+        client = app.test_client()
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            res = client.post("/api/auth/login", json={
+                "email": emails[i % len(emails)],
+                "password": "benchmark-password",
+            })
+            if res.status_code != 200:
+                failures.append(res.status_code)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return time.perf_counter() - start, failures
+
+
+def main():
+    args = parse_args()
+
+    from config import Config
+    Config.BCRYPT_LOG_ROUNDS = args.rounds
+    Config.BCRYPT_POOL_SIZE = 0
+
+    from app_factory import create_app
+    from services import passwords
+
+    app = create_app(
+        "local",
+        overrides={"STORAGE_BACKEND": "memory", "NOTIFICATION_SINK": "memory"},
+        start_background=False,
+    )
+
+    # Seed users directly (hashing cost excluded from the timings)
+    client = app.test_client()
+    emails = []
+    for i in range(args.users):
+        email = f"bench{i}@example.com"
+        client.post("/api/auth/signup", json={
+            "name": f"Bench {i}",
+            "email": email,
+            "password": "benchmark-password",
+            "phone": "0000000000",
+            "role": "homeowner",
+        })
+        emails.append(email)
+
+    cpus = os.cpu_count() or 1
+    print(f"bcrypt cost {args.rounds}, {args.threads} threads, {cpus} CPUs")
+    print(f"{'pool':>6} {'logins':>8} {'seconds':>9} {'logins/s':>10} {'per core':>10}")
+
+    for size in [int(s) for s in args.pool_sizes.split(",")]:
+        passwords.shutdown_pool()
+        Config.BCRYPT_POOL_SIZE = size
+        passwords.start_pool()
+
+        elapsed, failures = run(app, emails, args.logins, args.threads)
+        rate = args.logins / elapsed
+        cores = min(size or args.threads, cpus)
+
+        print(
+            f"{size or 'inline':>6} {args.logins:>8} {elapsed:>9.2f} "
+            f"{rate:>10.1f} {rate / cores:>10.1f}"
+            + (f"  ({len(failures)} failed)" if failures else "")
+        )
+
+    passwords.shutdown_pool()
+
+
+if __name__ == "__main__":
+    main()
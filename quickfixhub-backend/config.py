@@ -5,3 +5,66 @@ class Config:
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = "Lax"
     SESSION_COOKIE_SECURE = False  # True in production (HTTPS)
+
+    AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
+
+    # Shared botocore client settings (utils/aws.py). The pool should
+    # be at least the number of request threads per worker process.
+    AWS_MAX_POOL_CONNECTIONS = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", "50"))
+    AWS_MAX_ATTEMPTS = int(os.getenv("AWS_MAX_ATTEMPTS", "5"))
+    AWS_CONNECT_TIMEOUT = float(os.getenv("AWS_CONNECT_TIMEOUT", "2"))
+    AWS_READ_TIMEOUT = float(os.getenv("AWS_READ_TIMEOUT", "5"))
+
+    # "dynamodb" (AWS) or "memory" (in-process, local / benchmarks)
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "dynamodb")
+
+    # Run offer expiry on a background thread inside the web process.
+    # Disable when cron_runner.py runs as its own process.
+    EXPIRY_WORKER_ENABLED = os.getenv("EXPIRY_WORKER_ENABLED", "1") == "1"
+
+    # Flat per-job payout shown on the provider dashboard
+    EARNINGS_PER_JOB = 50
+
+    # Response JSON encoder: "auto" (orjson when installed),
+    # "orjson" or "stdlib" (utils/json_provider.py)
+    JSON_ENCODER = os.getenv("JSON_ENCODER", "auto")
+
+    # Add an X-DynamoDB-Calls summary header to every response
+    DYNAMODB_DEBUG_HEADER = os.getenv("DYNAMODB_DEBUG_HEADER", "0") == "1"
+
+    # Serve GET /api/metrics (Prometheus text, unauthenticated):
+    # on by default locally only, opt-in when deployed
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0") == "1"
+
+    # Password hashing: bcrypt work factor (stored hashes with a
+    # different cost are rehashed on login) and the size of the
+    # hashing process pool (0 = hash on the request thread)
+    BCRYPT_LOG_ROUNDS = int(os.getenv("BCRYPT_LOG_ROUNDS", "12"))
+    BCRYPT_POOL_SIZE = int(
+        os.getenv("BCRYPT_POOL_SIZE", str(os.cpu_count() or 1))
+    )
+
+    # Read-through cache for users / provider profiles
+    CACHE_ENABLED = os.getenv("CACHE_ENABLED", "1") == "1"
+    CACHE_MAXSIZE = int(os.getenv("CACHE_MAXSIZE", "10000"))
+    CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+
+    # Notifications: "sns" (AWS), "log" (local) or "memory" (tests)
+    NOTIFICATION_SINK = os.getenv("NOTIFICATION_SINK", "sns")
+    SNS_TOPIC_ARN = os.getenv(
+        "SNS_TOPIC_ARN",
+        "arn:aws:sns:us-east-1:905418361023:aws_capstone_topic"
+    )
+    NOTIFICATION_QUEUE_SIZE = int(os.getenv("NOTIFICATION_QUEUE_SIZE", "1000"))
+    NOTIFICATION_WORKERS = int(os.getenv("NOTIFICATION_WORKERS", "2"))
+
+    # Server-Sent Events (services/events.py, utils/sse.py).
+    # Fan-out "local" only reaches streams held by the same process.
+    EVENT_FANOUT = os.getenv("EVENT_FANOUT", "local")
+    EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "100"))
+    SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+    # Streams end after this long; EventSource reconnects by itself
+    SSE_MAX_STREAM_SECONDS = float(os.getenv("SSE_MAX_STREAM_SECONDS", "300"))
+    # Open streams per process (503 past it). Each holds a thread:
+    # keep it well below the gunicorn --threads of a worker
+    SSE_MAX_STREAMS = int(os.getenv("SSE_MAX_STREAMS", "16"))
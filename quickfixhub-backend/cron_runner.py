@@ -1,8 +1,5 @@
 # cron_runner.py
-import time
-from services.timeout_service import handle_expired_offers
+from services.timeout_service import run_expiry_scheduler
 
-while True:
-    print("Checking for expired offers...")
-    handle_expired_offers()
-    time.sleep(180)  # every 60 seconds
+# Wakes at the next offer deadline instead of polling the table
+run_expiry_scheduler()
@@ -0,0 +1,128 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+# ----------------------------------
+# Bounded LRU + TTL cache
+# ----------------------------------
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire after `ttl`
+    seconds. Misses (None) are not cached.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()   # key -> (expires_at, value)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key, loader):
+        value = self.get(key)
+        if value is None:
+            value = loader(key)
+            if value is not None:
+                self.set(key, value)
+        return value
+
+    def invalidate(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self.entries),
+            }
+
+
+# ----------------------------------
+# Read-through repository wrapper
+# ----------------------------------
+class CachedRepository:
+    """
+    Caches users and provider profiles in front of any backend.
+    Writes through this wrapper invalidate the affected entry;
+    other workers see changes after at most `ttl` seconds.
+    Every other call is passed straight to the backend.
+    """
+
+    def __init__(self, inner, maxsize, ttl):
+        self.inner = inner
+        self.users = TTLCache(maxsize, ttl)
+        self.provider_profiles = TTLCache(maxsize, ttl)
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    # ==========================================================
+    # USERS
+    # ==========================================================
+    def get_user(self, user_id):
+        item = self.users.get_or_load(user_id, self.inner.get_user)
+        return dict(item) if item else None
+
+    def create_user(self, item):
+        self.inner.create_user(item)
+        self.users.invalidate(item["user_id"])
+
+    def update_user(self, user_id, fields):
+        self.inner.update_user(user_id, fields)
+        self.users.invalidate(user_id)
+
+    def delete_user(self, user_id):
+        self.inner.delete_user(user_id)
+        self.users.invalidate(user_id)
+
+    # ==========================================================
+    # PROVIDER PROFILES
+    # ==========================================================
+    def get_provider_profile(self, provider_id):
+        item = self.provider_profiles.get_or_load(
+            provider_id, self.inner.get_provider_profile
+        )
+        return dict(item) if item else None
+
+    def put_provider_profile(self, item):
+        self.inner.put_provider_profile(item)
+        self.provider_profiles.invalidate(item["provider_id"])
+
+    # ==========================================================
+    # STATS
+    # ==========================================================
+    def cache_stats(self):
+        return {
+            "users": self.users.stats(),
+            "provider_profiles": self.provider_profiles.stats(),
+        }
@@ -1,18 +1,873 @@
-import boto3
 import os
+import random
+import time
+import zlib
 
-AWS_REGION = "us-east-1"
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
+
+from config import Config
+from db.repository import (
+    AcceptConflict,
+    ConditionFailed,
+    InvalidStartKey,
+    offer_expiry_fields,
+    provider_stats_from_item,
+)
+from utils.aws import get_resource
+from utils.geo import UNLOCATED_CELL, location_fields
+
+
+def dynamodb():
+    """Shared DynamoDB resource of this process (see utils/aws.py)."""
+    return get_resource("dynamodb")
+
+
+class LazyTable:
+    """
+    Stands in for dynamodb.Table(name): the boto3 Table is built on
+    first use and rebuilt after a fork. `.name` needs no AWS call.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._pid = None
+        self._table = None
+
+    def __getattr__(self, attr):
+        if self._pid != os.getpid():
+            self._table = dynamodb().Table(self.name)
+            self._pid = os.getpid()
+        return getattr(self._table, attr)
 
-dynamodb = boto3.resource("dynamodb", region_name=AWS_REGION)
 
 # ----------------------------------
 # Tables (must already exist in AWS)
 # ----------------------------------
 
-users_table = dynamodb.Table("Users")
+users_table = LazyTable("Users")
+
+# PK: email → user_id (uniqueness claim + login lookup)
+user_emails_table = LazyTable("UserEmails")
+
+provider_profiles_table = LazyTable("ProviderProfiles")
+
+# PK: service_type, SK: provider_id (inverted index of profiles)
+provider_service_types_table = LazyTable("ProviderServiceTypes")
+
+# GSI on ProviderServiceTypes (projection ALL):
+#   PK service_type, SK geohash → begins_with(cell) finds the
+#   providers of a trade inside one geohash cell, and
+#   geohash = UNLOCATED_CELL those without a location
+SERVICE_GEOHASH_INDEX = "ServiceGeohashIndex"
+
+# PK: provider_id → dashboard aggregates (see PROVIDER_STATS_FIELDS)
+provider_stats_table = LazyTable("ProviderStats")
+
+service_requests_table = LazyTable("ServiceRequests")
+
+# GSI on ServiceRequests (projection ALL): PK user_id, SK created_at
+USER_REQUESTS_INDEX = "UserRequestsIndex"
+
+# Sparse GSI on ServiceRequests (projection ALL):
+#   PK expiry_shard (N), SK offer_expires_epoch (N)
+# Only requests in "offered" state carry these attributes.
+OFFER_EXPIRY_INDEX = "OfferExpiryIndex"
+EXPIRY_INDEX_SHARDS = 4
+
+# TransactWriteItems attempts on TransactionConflict
+TRANSACT_ATTEMPTS = 4
+
+service_offers_table = LazyTable("ServiceOffers")
+
+# PK: user_id → version (N), bumped with every write that changes
+# the user's request / job listings (listing ETags)
+change_versions_table = LazyTable("ChangeVersions")
+
+# GSI on ServiceOffers (projection ALL): PK provider_id, SK status.
+# Offer items carry a denormalized request summary for the inbox.
+PROVIDER_INBOX_INDEX = "ProviderInboxIndex"
+
+
+# ----------------------------------
+# Helpers
+# ----------------------------------
+def _paginate(operation, **kwargs):
+    """
+    Runs a scan/query to completion, following LastEvaluatedKey
+    so results are not silently cut at the 1 MB page limit.
+    """
+    items = []
+    while True:
+        res = operation(**kwargs)
+        items.extend(res.get("Items", []))
+        last_key = res.get("LastEvaluatedKey")
+        if not last_key:
+            return items
+        kwargs["ExclusiveStartKey"] = last_key
+
+
+def _page(operation, limit, start_key=None, key_attrs=(), **kwargs):
+    """
+    One page of a scan/query: (items, LastEvaluatedKey or None).
+    Raises InvalidStartKey for a start key DynamoDB could not have
+    returned: LastEvaluatedKey holds exactly `key_attrs` (the table
+    key plus the index key), all strings here.
+    """
+    kwargs["Limit"] = limit
+    if start_key is not None:
+        if not (
+            isinstance(start_key, dict)
+            and set(start_key) == set(key_attrs)
+            and all(isinstance(v, str) for v in start_key.values())
+        ):
+            raise InvalidStartKey(start_key)
+        kwargs["ExclusiveStartKey"] = start_key
+
+    try:
+        res = operation(**kwargs)
+    except ClientError as e:
+        # Well-formed but not a key of this table / index
+        if start_key is not None and _error_code(e) == "ValidationException":
+            raise InvalidStartKey(start_key) from e
+        raise
+
+    return res.get("Items", []), res.get("LastEvaluatedKey")
+
+
+def _projection(attributes):
+    """
+    ProjectionExpression kwargs reading only `attributes`
+    (None → whole items). Names are always aliased: several
+    attributes (status, name, ...) are reserved words.
+    """
+    if not attributes:
+        return {}
+    names = {f"#p{i}": attr for i, attr in enumerate(attributes)}
+    return {
+        "ProjectionExpression": ", ".join(names),
+        "ExpressionAttributeNames": names,
+    }
+
+
+def _batch_get(table, keys, attributes=None):
+    """
+    BatchGetItem in chunks of 100 keys, retrying UnprocessedKeys.
+    """
+    items = []
+    projection = _projection(attributes)
+    for start in range(0, len(keys), 100):
+        request = {table.name: {"Keys": keys[start:start + 100], **projection}}
+        while request:
+            res = dynamodb().batch_get_item(RequestItems=request)
+            items.extend(res.get("Responses", {}).get(table.name, []))
+            request = res.get("UnprocessedKeys")
+    return items
+
+
+def _error_code(error):
+    return error.response.get("Error", {}).get("Code")
+
+
+def _service_type_entry(profile, service_type):
+    entry = {
+        "service_type": service_type,
+        "provider_id": profile["provider_id"],
+        "is_verified": profile.get("is_verified", False),
+    }
+    # Location (utils/geo.py) → keys the ServiceGeohashIndex;
+    # unlocated providers are indexed under UNLOCATED_CELL
+    entry["geohash"] = profile.get("geohash") or UNLOCATED_CELL
+    for attr in ("lat", "lon"):
+        if profile.get(attr) is not None:
+            entry[attr] = profile[attr]
+    return entry
+
+
+def _expiry_shard(request_id):
+    return zlib.crc32(request_id.encode()) % EXPIRY_INDEX_SHARDS
+
+
+def _with_expiry_index(request_id, fields):
+    fields, remove = offer_expiry_fields(fields)
+    if "offer_expires_epoch" in fields:
+        fields["expiry_shard"] = _expiry_shard(request_id)
+    if remove:
+        fields.pop("expiry_shard", None)
+        remove = remove + ["expiry_shard"]
+    return fields, remove
+
+
+def _update_expression(fields, increments=None, remove=()):
+    names = {}
+    values = {}
+    parts = []
+
+    for i, (attr, value) in enumerate(fields.items()):
+        names[f"#f{i}"] = attr
+        values[f":f{i}"] = value
+        parts.append(f"#f{i} = :f{i}")
+
+    for i, (attr, amount) in enumerate((increments or {}).items()):
+        names[f"#i{i}"] = attr
+        values[f":i{i}"] = amount
+        values[":zero"] = 0
+        parts.append(f"#i{i} = if_not_exists(#i{i}, :zero) + :i{i}")
+
+    expression = "SET " + ", ".join(parts)
+
+    if remove:
+        for i, attr in enumerate(remove):
+            names[f"#r{i}"] = attr
+        expression += " REMOVE " + ", ".join(
+            f"#r{i}" for i in range(len(remove))
+        )
+
+    return expression, names, values
+
+
+def _request_update_action(request_id, fields, increments=None, expected=None):
+    """`expected` → attribute values the stored item must still hold."""
+    fields, remove = _with_expiry_index(request_id, fields)
+    expression, names, values = _update_expression(fields, increments, remove)
+    action = {
+        "TableName": service_requests_table.name,
+        "Key": {"request_id": request_id},
+        "UpdateExpression": expression,
+        "ExpressionAttributeNames": names,
+        "ExpressionAttributeValues": values,
+    }
+
+    if expected:
+        conditions = []
+        for i, (attr, value) in enumerate(expected.items()):
+            names[f"#c{i}"] = attr
+            values[f":c{i}"] = value
+            conditions.append(f"#c{i} = :c{i}")
+        action["ConditionExpression"] = " AND ".join(conditions)
+
+    return action
+
+
+def _offer_status_action(request_id, provider_id, status):
+    return {
+        "TableName": service_offers_table.name,
+        "Key": {"request_id": request_id, "provider_id": provider_id},
+        "UpdateExpression": "SET #s = :s",
+        "ExpressionAttributeNames": {"#s": "status"},
+        "ExpressionAttributeValues": {":s": status},
+    }
+
+
+def _version_bump_action(user_id):
+    return {
+        "TableName": change_versions_table.name,
+        "Key": {"user_id": user_id},
+        "UpdateExpression": "ADD #v :one",
+        "ExpressionAttributeNames": {"#v": "version"},
+        "ExpressionAttributeValues": {":one": 1},
+    }
+
+
+def _transact_action(op):
+    kind = op[0]
+    if kind == "put_offer":
+        return {"Put": {"TableName": service_offers_table.name, "Item": op[1]}}
+    if kind == "set_offer_status":
+        return {"Update": _offer_status_action(*op[1:])}
+    if kind == "update_request":
+        return {"Update": _request_update_action(*op[1:])}
+    if kind == "bump_version":
+        return {"Update": _version_bump_action(op[1])}
+    raise ValueError(f"Unknown write op: {kind}")
+
+
+def _is_conflict(error):
+    reasons = error.response.get("CancellationReasons", [])
+    return any(r.get("Code") == "TransactionConflict" for r in reasons)
+
+
+def _is_condition_failure(error):
+    reasons = error.response.get("CancellationReasons", [])
+    return any(r.get("Code") == "ConditionalCheckFailed" for r in reasons)
+
+
+def _transact(actions):
+    """TransactWriteItems, retrying transaction conflicts with jittered backoff."""
+    for attempt in range(TRANSACT_ATTEMPTS):
+        try:
+            dynamodb().meta.client.transact_write_items(TransactItems=actions)
+            return
+        except ClientError as e:
+            if (
+                _error_code(e) != "TransactionCanceledException"
+                or not _is_conflict(e)
+                or attempt == TRANSACT_ATTEMPTS - 1
+            ):
+                raise
+            time.sleep(random.uniform(0, 0.05 * 2 ** attempt))
+
+
+# ----------------------------------
+# Repository
+# ----------------------------------
+class DynamoDBRepository:
+    """
+    Storage backend over the DynamoDB tables above.
+    Access patterns without a key/GSI still fall back to scans.
+    """
+
+    # ==========================================================
+    # USERS
+    # ==========================================================
+    def get_user(self, user_id):
+        return users_table.get_item(Key={"user_id": user_id}).get("Item")
+
+    def find_user_by_email(self, email):
+        claim = user_emails_table.get_item(
+            Key={"email": email}
+        ).get("Item")
+        return self.get_user(claim["user_id"]) if claim else None
+
+    def create_user(self, item):
+        """
+        Writes the user and its email claim in one transaction.
+        Raises ConditionFailed if the email is already taken.
+        """
+        try:
+            _transact([
+                {
+                    "Put": {
+                        "TableName": user_emails_table.name,
+                        "Item": {
+                            "email": item["email"],
+                            "user_id": item["user_id"],
+                        },
+                        "ConditionExpression": "attribute_not_exists(email)",
+                    }
+                },
+                {
+                    "Put": {
+                        "TableName": users_table.name,
+                        "Item": item,
+                        "ConditionExpression": "attribute_not_exists(user_id)",
+                    }
+                },
+            ])
+        except ClientError as e:
+            if (
+                _error_code(e) == "TransactionCanceledException"
+                and _is_condition_failure(e)
+            ):
+                raise ConditionFailed(item["email"]) from e
+            raise
+
+    def update_user(self, user_id, fields):
+        """
+        Sets `fields` on an existing user (email is not changed here:
+        it is owned by the UserEmails claim).
+        """
+        expression, names, values = _update_expression(fields)
+        try:
+            users_table.update_item(
+                Key={"user_id": user_id},
+                UpdateExpression=expression,
+                ConditionExpression="attribute_exists(user_id)",
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values,
+            )
+        except ClientError as e:
+            if _error_code(e) == "ConditionalCheckFailedException":
+                raise ConditionFailed(user_id) from e
+            raise
+
+    def delete_user(self, user_id):
+        user = self.get_user(user_id)
+        if not user:
+            return
+
+        users_table.delete_item(Key={"user_id": user_id})
+
+        try:
+            user_emails_table.delete_item(
+                Key={"email": user["email"]},
+                ConditionExpression=Attr("user_id").eq(user_id)
+            )
+        except ClientError as e:
+            if _error_code(e) != "ConditionalCheckFailedException":
+                raise
+
+    # ==========================================================
+    # PROVIDER PROFILES
+    # ==========================================================
+    def get_provider_profile(self, provider_id):
+        return provider_profiles_table.get_item(
+            Key={"provider_id": provider_id}
+        ).get("Item")
+
+    def put_provider_profile(self, item):
+        """
+        Writes the profile and its ProviderServiceTypes entries
+        in one transaction, dropping entries for removed types.
+        """
+        old = self.get_provider_profile(item["provider_id"]) or {}
+        removed = set(old.get("service_types", [])) - set(item["service_types"])
+
+        actions = [
+            {"Put": {"TableName": provider_profiles_table.name, "Item": item}}
+        ]
+
+        for service_type in item["service_types"]:
+            actions.append({
+                "Put": {
+                    "TableName": provider_service_types_table.name,
+                    "Item": _service_type_entry(item, service_type),
+                }
+            })
+
+        for service_type in removed:
+            actions.append({
+                "Delete": {
+                    "TableName": provider_service_types_table.name,
+                    "Key": {
+                        "service_type": service_type,
+                        "provider_id": item["provider_id"],
+                    },
+                }
+            })
+
+        dynamodb().meta.client.transact_write_items(TransactItems=actions)
+
+    def list_providers_for_service(self, service_type):
+        return _paginate(
+            provider_service_types_table.query,
+            KeyConditionExpression=Key("service_type").eq(service_type)
+        )
+
+    def list_providers_near(self, service_type, cells):
+        """Entries of `service_type` inside any of the geohash `cells`."""
+        entries = {}
+        for cell in cells:
+            for entry in _paginate(
+                provider_service_types_table.query,
+                IndexName=SERVICE_GEOHASH_INDEX,
+                KeyConditionExpression=(
+                    Key("service_type").eq(service_type)
+                    & Key("geohash").begins_with(cell)
+                ),
+            ):
+                entries[entry["provider_id"]] = entry
+        return list(entries.values())
+
+    # ==========================================================
+    # PROVIDER AGGREGATES (ProviderStats)
+    # ==========================================================
+    def get_provider_stats(self, provider_id):
+        return provider_stats_from_item(
+            provider_stats_table.get_item(
+                Key={"provider_id": provider_id}
+            ).get("Item")
+        )
+
+    def get_active_jobs(self, provider_ids):
+        """Returns {provider_id: active_jobs} with one batched read."""
+        keys = [{"provider_id": pid} for pid in dict.fromkeys(provider_ids)]
+        counts = {pid: 0 for pid in provider_ids}
+        for item in _batch_get(provider_stats_table, keys):
+            counts[item["provider_id"]] = int(item.get("active_jobs", 0))
+        return counts
+
+    def release_provider_slot(self, provider_id, completed=False, earnings=0):
+        """
+        Decrements active_jobs (never below zero). A completed job
+        also adds to jobs_completed / earnings in the same update.
+        """
+        adds = {":minus_one": -1}
+        if completed:
+            adds.update({":one": 1, ":earned": earnings})
+
+        expression = "ADD active_jobs :minus_one"
+        if completed:
+            expression += ", jobs_completed :one, earnings :earned"
+
+        try:
+            provider_stats_table.update_item(
+                Key={"provider_id": provider_id},
+                UpdateExpression=expression,
+                ConditionExpression=Attr("active_jobs").gt(0),
+                ExpressionAttributeValues=adds,
+            )
+        except ClientError as e:
+            if _error_code(e) != "ConditionalCheckFailedException":
+                raise
+            if completed:
+                provider_stats_table.update_item(
+                    Key={"provider_id": provider_id},
+                    UpdateExpression="ADD jobs_completed :one, earnings :earned",
+                    ExpressionAttributeValues={":one": 1, ":earned": earnings},
+                )
+
+    # ==========================================================
+    # SERVICE REQUESTS
+    # ==========================================================
+    def get_request(self, request_id):
+        return service_requests_table.get_item(
+            Key={"request_id": request_id}
+        ).get("Item")
+
+    def get_requests(self, request_ids, attributes=None):
+        keys = [{"request_id": rid} for rid in dict.fromkeys(request_ids)]
+        return _batch_get(service_requests_table, keys, attributes)
+
+    def put_request(self, item):
+        item, _ = _with_expiry_index(item["request_id"], item)
+        service_requests_table.put_item(Item=item)
+
+    def update_request(self, request_id, fields, increments=None):
+        res = service_requests_table.update_item(
+            **_request_update_action(request_id, fields, increments),
+            ReturnValues="ALL_NEW",
+        )
+        return res.get("Attributes")
+
+    def page_requests(self, limit, start_key=None, attributes=None):
+        return _page(
+            service_requests_table.scan,
+            limit,
+            start_key,
+            key_attrs=("request_id",),
+            **_projection(attributes)
+        )
+
+    def list_requests_for_user(self, user_id):
+        return _paginate(
+            service_requests_table.query,
+            IndexName=USER_REQUESTS_INDEX,
+            KeyConditionExpression=Key("user_id").eq(user_id)
+        )
+
+    def page_requests_for_user(self, user_id, limit, start_key=None, attributes=None):
+        return _page(
+            service_requests_table.query,
+            limit,
+            start_key,
+            key_attrs=("request_id", "user_id", "created_at"),
+            IndexName=USER_REQUESTS_INDEX,
+            KeyConditionExpression=Key("user_id").eq(user_id),
+            **_projection(attributes)
+        )
+
+    def list_requests_for_provider(self, provider_id, statuses=None, attributes=None):
+        condition = Attr("assigned_provider_id").eq(provider_id)
+        if statuses is not None:
+            condition = condition & Attr("status").is_in(list(statuses))
+        return _paginate(
+            service_requests_table.scan,
+            FilterExpression=condition,
+            **_projection(attributes)
+        )
+
+    def list_due_requests(self, now_epoch):
+        """Offered requests whose offer_expires_epoch <= now."""
+        items = []
+        for shard in range(EXPIRY_INDEX_SHARDS):
+            items.extend(_paginate(
+                service_requests_table.query,
+                IndexName=OFFER_EXPIRY_INDEX,
+                KeyConditionExpression=(
+                    Key("expiry_shard").eq(shard)
+                    & Key("offer_expires_epoch").lte(now_epoch)
+                ),
+            ))
+        return items
+
+    def next_offer_expiry(self):
+        earliest = None
+        for shard in range(EXPIRY_INDEX_SHARDS):
+            res = service_requests_table.query(
+                IndexName=OFFER_EXPIRY_INDEX,
+                KeyConditionExpression=Key("expiry_shard").eq(shard),
+                ProjectionExpression="offer_expires_epoch",
+                ScanIndexForward=True,
+                Limit=1,
+            )
+            for item in res.get("Items", []):
+                epoch = int(item["offer_expires_epoch"])
+                if earliest is None or epoch < earliest:
+                    earliest = epoch
+        return earliest
+
+    # ==========================================================
+    # SERVICE OFFERS (PK: request_id, SK: provider_id)
+    # ==========================================================
+    def get_offer(self, request_id, provider_id):
+        return service_offers_table.get_item(
+            Key={
+                "request_id": request_id,
+                "provider_id": provider_id
+            }
+        ).get("Item")
+
+    def put_offer(self, item):
+        service_offers_table.put_item(Item=item)
+
+    def update_offer_status(self, request_id, provider_id, status):
+        res = service_offers_table.update_item(
+            Key={
+                "request_id": request_id,
+                "provider_id": provider_id
+            },
+            UpdateExpression="SET #s = :s",
+            ExpressionAttributeNames={"#s": "status"},
+            ExpressionAttributeValues={":s": status},
+            ReturnValues="ALL_NEW",
+        )
+        return res.get("Attributes")
+
+    def list_offers_for_request(self, request_id, status=None):
+        kwargs = {"KeyConditionExpression": Key("request_id").eq(request_id)}
+        if status is not None:
+            kwargs["FilterExpression"] = Attr("status").eq(status)
+        return _paginate(service_offers_table.query, **kwargs)
+
+    def list_offers_for_provider(self, provider_id, status=None):
+        condition = Key("provider_id").eq(provider_id)
+        if status is not None:
+            condition = condition & Key("status").eq(status)
+        return _paginate(
+            service_offers_table.query,
+            IndexName=PROVIDER_INBOX_INDEX,
+            KeyConditionExpression=condition
+        )
+
+    # ==========================================================
+    # CHANGE VERSIONS (ChangeVersions)
+    # ==========================================================
+    def get_change_version(self, user_id):
+        item = change_versions_table.get_item(
+            Key={"user_id": user_id},
+            ProjectionExpression="#v",
+            ExpressionAttributeNames={"#v": "version"},
+        ).get("Item")
+        return int(item["version"]) if item else 0
+
+    # ==========================================================
+    # BATCHED WRITES
+    # ==========================================================
+    def transact_write(self, ops):
+        """
+        Applies up to 25 write ops in one TransactWriteItems:
+          ("put_offer", item)
+          ("set_offer_status", request_id, provider_id, status)
+          ("update_request", request_id, fields, increments, expected)
+          ("bump_version", user_id)
+        Transaction conflicts are retried with jittered backoff.
+        Raises ConditionFailed (nothing written) when a request no
+        longer holds its `expected` values.
+        """
+        try:
+            _transact([_transact_action(op) for op in ops])
+        except ClientError as e:
+            if (
+                _error_code(e) == "TransactionCanceledException"
+                and _is_condition_failure(e)
+            ):
+                raise ConditionFailed("request") from e
+            raise
+
+    def accept_offer(self, request_id, provider_id, request_fields,
+                     max_active_jobs, touch=()):
+        """
+        One conditional TransactWriteItems:
+          offer    offered → accepted
+          request  offered → `request_fields` (accepted, assignee, ...)
+          stats    active_jobs + 1, only while below `max_active_jobs`
+          versions change version + 1 for each of `touch`
+        Raises AcceptConflict naming the condition that failed, so two
+        providers can never both win the same request.
+        """
+        offer = _offer_status_action(request_id, provider_id, "accepted")
+        offer["ConditionExpression"] = "#s = :offered"
+        offer["ExpressionAttributeValues"][":offered"] = "offered"
+
+        request = _request_update_action(request_id, request_fields)
+        request["ConditionExpression"] = "#req_status = :offered"
+        request["ExpressionAttributeNames"]["#req_status"] = "status"
+        request["ExpressionAttributeValues"][":offered"] = "offered"
+
+        stats = {
+            "TableName": provider_stats_table.name,
+            "Key": {"provider_id": provider_id},
+            "UpdateExpression": "ADD active_jobs :one",
+            "ConditionExpression": (
+                "attribute_not_exists(active_jobs) OR active_jobs < :limit"
+            ),
+            "ExpressionAttributeValues": {":one": 1, ":limit": max_active_jobs},
+        }
+
+        try:
+            _transact(
+                [{"Update": offer}, {"Update": request}, {"Update": stats}]
+                + [
+                    {"Update": _version_bump_action(user_id)}
+                    for user_id in dict.fromkeys(touch) if user_id
+                ]
+            )
+        except ClientError as e:
+            if _error_code(e) != "TransactionCanceledException":
+                raise
+            reasons = e.response.get("CancellationReasons", [])
+            for reason, name in zip(reasons, ("offer", "request", "capacity")):
+                if reason.get("Code") == "ConditionalCheckFailed":
+                    raise AcceptConflict(name) from e
+            raise
+
+
+# ----------------------------------
+# Backfills (see rebuild_indexes.py)
+# ----------------------------------
+def backfill_user_emails():
+    """Creates missing UserEmails claims for existing users."""
+    created = 0
+
+    for user in _paginate(
+        users_table.scan,
+        ProjectionExpression="user_id, email"
+    ):
+        try:
+            user_emails_table.put_item(
+                Item={"email": user["email"], "user_id": user["user_id"]},
+                ConditionExpression="attribute_not_exists(email)"
+            )
+            created += 1
+        except ClientError as e:
+            if _error_code(e) != "ConditionalCheckFailedException":
+                raise
+
+    return created
+
+
+def backfill_provider_service_types():
+    """Re-derives ProviderServiceTypes entries from ProviderProfiles."""
+    written = 0
+
+    with provider_service_types_table.batch_writer() as batch:
+        for profile in _paginate(provider_profiles_table.scan):
+            for service_type in profile.get("service_types", []):
+                batch.put_item(Item=_service_type_entry(profile, service_type))
+                written += 1
+
+    return written
+
+
+def backfill_provider_geo():
+    """
+    Brings stored profile locations in line with geocode(): places
+    profiles written before locations were stored, drops points for
+    addresses that can't be placed, and rewrites their
+    ProviderServiceTypes entries (geohash index). Entries of
+    unlocated profiles are always rewritten, under UNLOCATED_CELL.
+    """
+    updated = 0
+
+    for profile in _paginate(provider_profiles_table.scan):
+        fields = location_fields(profile.get("address") or "")
+        moved = fields.get("geohash") != profile.get("geohash")
+        if fields and not moved:
+            continue
+
+        if moved and fields:
+            provider_profiles_table.update_item(
+                Key={"provider_id": profile["provider_id"]},
+                UpdateExpression="SET lat = :lat, lon = :lon, geohash = :geohash",
+                ExpressionAttributeValues={
+                    ":lat": fields["lat"],
+                    ":lon": fields["lon"],
+                    ":geohash": fields["geohash"],
+                },
+            )
+            profile.update(fields)
+        elif moved:
+            provider_profiles_table.update_item(
+                Key={"provider_id": profile["provider_id"]},
+                UpdateExpression="REMOVE lat, lon, geohash",
+            )
+            for attr in ("lat", "lon", "geohash"):
+                profile.pop(attr, None)
+
+        for service_type in profile.get("service_types", []):
+            provider_service_types_table.put_item(
+                Item=_service_type_entry(profile, service_type)
+            )
+        updated += 1
+
+    return updated
+
+
+def backfill_provider_stats():
+    """
+    Recomputes ProviderStats job counters and earnings from
+    ServiceRequests. Rating fields are left untouched.
+    """
+    stats = {}
+
+    for profile in _paginate(
+        provider_profiles_table.scan,
+        ProjectionExpression="provider_id"
+    ):
+        stats[profile["provider_id"]] = {"active": 0, "completed": 0}
+
+    for req in _paginate(
+        service_requests_table.scan,
+        FilterExpression=Attr("status").is_in(
+            ["accepted", "in_progress", "completed"]
+        ),
+        ProjectionExpression="assigned_provider_id, #s",
+        ExpressionAttributeNames={"#s": "status"}
+    ):
+        pid = req.get("assigned_provider_id")
+        if not pid:
+            continue
+        counts = stats.setdefault(pid, {"active": 0, "completed": 0})
+        if req["status"] == "completed":
+            counts["completed"] += 1
+        else:
+            counts["active"] += 1
+
+    for pid, counts in stats.items():
+        provider_stats_table.update_item(
+            Key={"provider_id": pid},
+            UpdateExpression=(
+                "SET active_jobs = :a, jobs_completed = :c, earnings = :e"
+            ),
+            ExpressionAttributeValues={
+                ":a": counts["active"],
+                ":c": counts["completed"],
+                ":e": counts["completed"] * Config.EARNINGS_PER_JOB,
+            },
+        )
+
+    return len(stats)
+
 
-provider_profiles_table = dynamodb.Table("ProviderProfiles")
+def backfill_offer_expiry():
+    """Adds OfferExpiryIndex keys to offered requests written before it."""
+    written = 0
 
-service_requests_table = dynamodb.Table("ServiceRequests")
+    for req in _paginate(
+        service_requests_table.scan,
+        FilterExpression=(
+            Attr("status").eq("offered")
+            & Attr("offer_expires_epoch").not_exists()
+        ),
+        ProjectionExpression="request_id, offer_expires_at"
+    ):
+        if not req.get("offer_expires_at"):
+            continue
+        DynamoDBRepository().update_request(
+            req["request_id"],
+            {"offer_expires_at": req["offer_expires_at"]}
+        )
+        written += 1
 
-service_offers_table = dynamodb.Table("ServiceOffers")
+    return written
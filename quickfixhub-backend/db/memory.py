@@ -0,0 +1,448 @@
+import heapq
+import itertools
+import threading
+from collections import defaultdict
+
+from db.repository import (
+    AcceptConflict,
+    ConditionFailed,
+    InvalidStartKey,
+    offer_expiry_fields,
+    provider_stats_from_item,
+)
+from utils.geo import UNLOCATED_CELL
+
+
+# ----------------------------------
+# In-process table with secondary indexes
+# ----------------------------------
+def _clone(item):
+    return {
+        k: list(v) if isinstance(v, list) else v
+        for k, v in item.items()
+    }
+
+
+def _index_values(item, attr):
+    if callable(attr):
+        return attr(item)
+    if isinstance(attr, tuple):
+        value = tuple(item.get(a) for a in attr)
+        return () if None in value else (value,)
+    value = item.get(attr)
+    if value is None:
+        return ()
+    if isinstance(value, list):
+        return value
+    return (value,)
+
+
+class MemoryTable:
+    """
+    Dict-backed table keyed by `key_attrs`.
+
+    Every attribute in `index_attrs` gets a hash index
+    (value -> ordered set of primary keys). Like a DynamoDB
+    GSI the indexes are sparse: missing / None values are
+    not indexed. List attributes index every element, a
+    tuple of attributes builds a compound index and a function
+    indexes the values it derives from the item.
+    """
+
+    def __init__(self, key_attrs, index_attrs=()):
+        self.key_attrs = tuple(key_attrs)
+        self.items = {}
+        self.indexes = {attr: defaultdict(dict) for attr in index_attrs}
+
+    def _key(self, item):
+        return tuple(item[attr] for attr in self.key_attrs)
+
+    def _index(self, key, item):
+        for attr, index in self.indexes.items():
+            for value in _index_values(item, attr):
+                index[value][key] = None
+
+    def _unindex(self, key, item):
+        for attr, index in self.indexes.items():
+            for value in _index_values(item, attr):
+                bucket = index.get(value)
+                if bucket is not None:
+                    bucket.pop(key, None)
+                    if not bucket:
+                        del index[value]
+
+    def get(self, *key):
+        item = self.items.get(key)
+        return _clone(item) if item else None
+
+    def put(self, item):
+        key = self._key(item)
+        old = self.items.get(key)
+        if old:
+            self._unindex(key, old)
+        stored = _clone(item)
+        self.items[key] = stored
+        self._index(key, stored)
+
+    def delete(self, *key):
+        old = self.items.pop(key, None)
+        if old:
+            self._unindex(key, old)
+
+    def update(self, key, fields, increments=None, remove=()):
+        old = self.items.get(key)
+        new = _clone(old) if old else dict(zip(self.key_attrs, key))
+        new.update(fields)
+        for attr, amount in (increments or {}).items():
+            new[attr] = (new.get(attr) or 0) + amount
+        for attr in remove:
+            new.pop(attr, None)
+        self.put(new)
+        return _clone(new)
+
+    def query(self, attr, value):
+        keys = self.indexes[attr].get(value, {})
+        return [_clone(self.items[k]) for k in keys]
+
+    def scan(self):
+        return [_clone(item) for item in self.items.values()]
+
+    def page(self, limit, offset=None, attr=None, value=None):
+        """
+        One page of a scan (or of an index bucket when `attr` is
+        given). The continuation key is the next offset.
+        """
+        if offset is not None and (type(offset) is not int or offset < 0):
+            raise InvalidStartKey(offset)
+
+        keys = self.items if attr is None else self.indexes[attr].get(value, {})
+        offset = offset or 0
+        selected = list(itertools.islice(keys, offset, offset + limit))
+        next_offset = offset + limit if offset + limit < len(keys) else None
+        return [_clone(self.items[k]) for k in selected], next_offset
+
+
+def _project(items, attributes):
+    if not attributes:
+        return items
+    return [
+        {attr: item[attr] for attr in attributes if attr in item}
+        for item in items
+    ]
+
+
+def _service_geohash_cells(profile):
+    """
+    (service_type, cell) for every geohash prefix of the profile:
+    the memory counterpart of ServiceGeohashIndex, where a cell of
+    any precision is one bucket lookup instead of begins_with.
+    """
+    geohash = profile.get("geohash") or UNLOCATED_CELL
+    return [
+        (service_type, geohash[:precision])
+        for service_type in profile.get("service_types") or ()
+        for precision in range(1, len(geohash) + 1)
+    ]
+
+
+def _service_type_entry(profile, service_type):
+    entry = {
+        "service_type": service_type,
+        "provider_id": profile["provider_id"],
+        "is_verified": profile.get("is_verified", False),
+        "geohash": profile.get("geohash") or UNLOCATED_CELL,
+    }
+    for attr in ("lat", "lon"):
+        if profile.get(attr) is not None:
+            entry[attr] = profile[attr]
+    return entry
+
+
+# ----------------------------------
+# Repository (same interface as DynamoDBRepository)
+# ----------------------------------
+class MemoryRepository:
+    """
+    In-process storage engine for local runs, benchmarks and tests.
+    Every access path the routes use is served from an index.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+
+        self.users = MemoryTable(["user_id"], ["email"])
+        self.provider_profiles = MemoryTable(
+            ["provider_id"], ["service_types", _service_geohash_cells]
+        )
+        self.provider_stats = MemoryTable(["provider_id"])
+        self.service_requests = MemoryTable(
+            ["request_id"],
+            ["user_id", "assigned_provider_id"],
+        )
+        # Min-heap of (offer_expires_epoch, request_id); stale
+        # entries are dropped lazily when they reach the top.
+        self.offer_expiry_heap = []
+        self.service_offers = MemoryTable(
+            ["request_id", "provider_id"],
+            ["request_id", "provider_id", ("provider_id", "status")],
+        )
+        self.change_versions = {}
+
+    # ==========================================================
+    # USERS
+    # ==========================================================
+    def get_user(self, user_id):
+        with self.lock:
+            return self.users.get(user_id)
+
+    def find_user_by_email(self, email):
+        with self.lock:
+            items = self.users.query("email", email)
+        return items[0] if items else None
+
+    def create_user(self, item):
+        with self.lock:
+            if self.users.query("email", item["email"]):
+                raise ConditionFailed(item["email"])
+            self.users.put(item)
+
+    def update_user(self, user_id, fields):
+        with self.lock:
+            if not self.users.get(user_id):
+                raise ConditionFailed(user_id)
+            self.users.update((user_id,), fields)
+
+    def delete_user(self, user_id):
+        with self.lock:
+            self.users.delete(user_id)
+
+    # ==========================================================
+    # PROVIDER PROFILES
+    # ==========================================================
+    def get_provider_profile(self, provider_id):
+        with self.lock:
+            return self.provider_profiles.get(provider_id)
+
+    def put_provider_profile(self, item):
+        with self.lock:
+            self.provider_profiles.put(item)
+
+    def list_providers_for_service(self, service_type):
+        with self.lock:
+            profiles = self.provider_profiles.query(
+                "service_types", service_type
+            )
+        return [_service_type_entry(p, service_type) for p in profiles]
+
+    def list_providers_near(self, service_type, cells):
+        profiles = {}
+        with self.lock:
+            for cell in cells:
+                for profile in self.provider_profiles.query(
+                    _service_geohash_cells, (service_type, cell)
+                ):
+                    profiles[profile["provider_id"]] = profile
+        return [_service_type_entry(p, service_type) for p in profiles.values()]
+
+    # ==========================================================
+    # PROVIDER AGGREGATES
+    # ==========================================================
+    def get_provider_stats(self, provider_id):
+        with self.lock:
+            return provider_stats_from_item(
+                self.provider_stats.items.get((provider_id,))
+            )
+
+    def get_active_jobs(self, provider_ids):
+        with self.lock:
+            counts = {}
+            for pid in provider_ids:
+                stats = self.provider_stats.items.get((pid,))
+                counts[pid] = stats.get("active_jobs", 0) if stats else 0
+            return counts
+
+    def release_provider_slot(self, provider_id, completed=False, earnings=0):
+        increments = {}
+        if completed:
+            increments = {"jobs_completed": 1, "earnings": earnings}
+
+        with self.lock:
+            if self.get_active_jobs([provider_id])[provider_id] > 0:
+                increments["active_jobs"] = -1
+            if increments:
+                self.provider_stats.update(
+                    (provider_id,), {}, increments=increments
+                )
+
+    # ==========================================================
+    # SERVICE REQUESTS
+    # ==========================================================
+    def get_request(self, request_id):
+        with self.lock:
+            return self.service_requests.get(request_id)
+
+    def get_requests(self, request_ids, attributes=None):
+        with self.lock:
+            items = (self.service_requests.get(rid) for rid in request_ids)
+            return _project([item for item in items if item], attributes)
+
+    def put_request(self, item):
+        item, _ = offer_expiry_fields(item)
+        with self.lock:
+            self.service_requests.put(item)
+            self._track_expiry(item)
+
+    def update_request(self, request_id, fields, increments=None):
+        fields, remove = offer_expiry_fields(fields)
+        with self.lock:
+            item = self.service_requests.update(
+                (request_id,), fields, increments, remove
+            )
+            self._track_expiry(item)
+            return item
+
+    def _track_expiry(self, item):
+        epoch = item.get("offer_expires_epoch")
+        if epoch is not None:
+            heapq.heappush(self.offer_expiry_heap, (epoch, item["request_id"]))
+
+    def _is_live_expiry(self, epoch, request_id):
+        item = self.service_requests.items.get((request_id,))
+        return bool(item) and item.get("offer_expires_epoch") == epoch
+
+    def list_due_requests(self, now_epoch):
+        with self.lock:
+            heap = self.offer_expiry_heap
+            due = {}
+            while heap and heap[0][0] <= now_epoch:
+                epoch, request_id = heapq.heappop(heap)
+                if self._is_live_expiry(epoch, request_id):
+                    due[request_id] = epoch
+
+            # Due entries stay indexed until their request moves on
+            for request_id, epoch in due.items():
+                heapq.heappush(heap, (epoch, request_id))
+
+            return [self.service_requests.get(rid) for rid in due]
+
+    def next_offer_expiry(self):
+        with self.lock:
+            heap = self.offer_expiry_heap
+            while heap and not self._is_live_expiry(*heap[0]):
+                heapq.heappop(heap)
+            return heap[0][0] if heap else None
+
+    def page_requests(self, limit, start_key=None, attributes=None):
+        with self.lock:
+            items, next_key = self.service_requests.page(limit, start_key)
+        return _project(items, attributes), next_key
+
+    def list_requests_for_user(self, user_id):
+        with self.lock:
+            return self.service_requests.query("user_id", user_id)
+
+    def page_requests_for_user(self, user_id, limit, start_key=None, attributes=None):
+        with self.lock:
+            items, next_key = self.service_requests.page(
+                limit, start_key, "user_id", user_id
+            )
+        return _project(items, attributes), next_key
+
+    def list_requests_for_provider(self, provider_id, statuses=None, attributes=None):
+        with self.lock:
+            items = self.service_requests.query(
+                "assigned_provider_id", provider_id
+            )
+        if statuses is not None:
+            items = [i for i in items if i["status"] in statuses]
+        return _project(items, attributes)
+
+    # ==========================================================
+    # SERVICE OFFERS
+    # ==========================================================
+    def get_offer(self, request_id, provider_id):
+        with self.lock:
+            return self.service_offers.get(request_id, provider_id)
+
+    def put_offer(self, item):
+        with self.lock:
+            self.service_offers.put(item)
+
+    def update_offer_status(self, request_id, provider_id, status):
+        with self.lock:
+            return self.service_offers.update(
+                (request_id, provider_id), {"status": status}
+            )
+
+    def list_offers_for_request(self, request_id, status=None):
+        with self.lock:
+            items = self.service_offers.query("request_id", request_id)
+        if status is None:
+            return items
+        return [i for i in items if i["status"] == status]
+
+    def list_offers_for_provider(self, provider_id, status=None):
+        with self.lock:
+            if status is None:
+                return self.service_offers.query("provider_id", provider_id)
+            return self.service_offers.query(
+                ("provider_id", "status"), (provider_id, status)
+            )
+
+    # ==========================================================
+    # CHANGE VERSIONS
+    # ==========================================================
+    def get_change_version(self, user_id):
+        with self.lock:
+            return self.change_versions.get(user_id, 0)
+
+    # ==========================================================
+    # BATCHED WRITES
+    # ==========================================================
+    def accept_offer(self, request_id, provider_id, request_fields,
+                     max_active_jobs, touch=()):
+        with self.lock:
+            offer = self.service_offers.get(request_id, provider_id)
+            if not offer or offer["status"] != "offered":
+                raise AcceptConflict("offer")
+
+            request = self.service_requests.get(request_id)
+            if not request or request["status"] != "offered":
+                raise AcceptConflict("request")
+
+            if self.get_active_jobs([provider_id])[provider_id] >= max_active_jobs:
+                raise AcceptConflict("capacity")
+
+            self.update_offer_status(request_id, provider_id, "accepted")
+            self.update_request(request_id, request_fields)
+            self.provider_stats.update(
+                (provider_id,), {}, increments={"active_jobs": 1}
+            )
+            for user_id in dict.fromkeys(touch):
+                if user_id:
+                    self._bump_version(user_id)
+
+    def _bump_version(self, user_id):
+        self.change_versions[user_id] = self.change_versions.get(user_id, 0) + 1
+
+    def transact_write(self, ops):
+        with self.lock:
+            # Conditions first: a stale expectation writes nothing
+            for op in ops:
+                if op[0] == "update_request" and op[4]:
+                    item = self.service_requests.items.get((op[1],)) or {}
+                    if any(item.get(a) != v for a, v in op[4].items()):
+                        raise ConditionFailed("request")
+
+            for op in ops:
+                kind = op[0]
+                if kind == "put_offer":
+                    self.put_offer(op[1])
+                elif kind == "set_offer_status":
+                    self.update_offer_status(*op[1:])
+                elif kind == "update_request":
+                    self.update_request(*op[1:4])
+                elif kind == "bump_version":
+                    self._bump_version(op[1])
+                else:
+                    raise ValueError(f"Unknown write op: {kind}")
@@ -0,0 +1,111 @@
+from config import Config
+from utils.time_utils import to_epoch
+
+# ----------------------------------
+# Storage backend selection
+# ----------------------------------
+#   "dynamodb" → db.dynamodb.DynamoDBRepository (AWS)
+#   "memory"   → db.memory.MemoryRepository (local / benchmarks)
+#
+# Routes and services only ever talk to get_repository().
+# Users / provider profiles are cached in front of either
+# backend (db.cache.CachedRepository) unless disabled.
+
+_repository = None
+
+
+# Counters kept per provider in ProviderStats
+PROVIDER_STATS_FIELDS = (
+    "active_jobs",
+    "jobs_completed",
+    "earnings",
+    "rating_total",
+    "rating_count",
+)
+
+
+class ConditionFailed(Exception):
+    """A conditional write lost (duplicate key, stale state, ...)."""
+
+
+class AcceptConflict(ConditionFailed):
+    """
+    accept_offer() lost. `reason` is which condition failed:
+      "offer"    → the offer is no longer open
+      "request"  → the request is no longer offered (taken / closed)
+      "capacity" → the provider is at the active-job limit
+    """
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class InvalidStartKey(ValueError):
+    """A page start key this backend could not have issued."""
+
+
+def provider_stats_from_item(item):
+    item = item or {}
+    return {field: int(item.get(field, 0)) for field in PROVIDER_STATS_FIELDS}
+
+
+def offer_expiry_fields(fields):
+    """
+    Keeps `offer_expires_epoch` (key of the sparse offer-expiry
+    index) in step with a request write: set while the request is
+    offered, removed as soon as it leaves that state.
+
+    Returns (fields, attrs_to_remove).
+    """
+    fields = dict(fields)
+
+    if fields.get("offer_expires_at"):
+        fields["offer_expires_epoch"] = to_epoch(fields["offer_expires_at"])
+        return fields, []
+
+    if (
+        "offer_expires_at" in fields
+        or fields.get("status", "offered") != "offered"
+    ):
+        fields.pop("offer_expires_epoch", None)
+        return fields, ["offer_expires_epoch"]
+
+    return fields, []
+
+
+def create_repository(backend, cached=None):
+    if backend == "dynamodb":
+        from db.dynamodb import DynamoDBRepository
+        repository = DynamoDBRepository()
+    elif backend == "memory":
+        from db.memory import MemoryRepository
+        repository = MemoryRepository()
+    else:
+        raise ValueError(f"Unknown storage backend: {backend}")
+
+    if cached is None:
+        cached = Config.CACHE_ENABLED
+
+    if cached:
+        from db.cache import CachedRepository
+        repository = CachedRepository(
+            repository,
+            maxsize=Config.CACHE_MAXSIZE,
+            ttl=Config.CACHE_TTL_SECONDS,
+        )
+
+    return repository
+
+
+def set_repository(repository):
+    global _repository
+    _repository = repository
+    return repository
+
+
+def get_repository():
+    global _repository
+    if _repository is None:
+        _repository = create_repository(Config.STORAGE_BACKEND)
+    return _repository
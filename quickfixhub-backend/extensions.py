@@ -1,6 +1,4 @@
-from flask_bcrypt import Bcrypt
 from flask_login import LoginManager
 
-bcrypt = Bcrypt()
 login_manager = LoginManager()
 login_manager.login_view = "/api/auth/login"
@@ -0,0 +1,99 @@
+from decimal import Decimal
+
+
+# ----------------------------------
+# Storage item ↔ model ↔ API
+# ----------------------------------
+#   from_item(item) → model   (Decimal → int / float)
+#   to_item()       → dict    storage item, snake_case keys
+#   to_dict()       → dict    API response, camelCase keys
+#
+# Each model lists FIELDS as (attr, item_key, api_key, default).
+# item_key None → not stored, api_key None → kept out of the API.
+# SUMMARY_FIELDS (API keys) is the slim shape of list views.
+
+def decode(value):
+    """DynamoDB numbers come back as Decimal; JSON wants int / float."""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, list):
+        return [decode(v) for v in value]
+    if isinstance(value, dict):
+        return {k: decode(v) for k, v in value.items()}
+    return value
+
+
+def encode(value):
+    """DynamoDB does not take floats."""
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, list):
+        return [encode(v) for v in value]
+    if isinstance(value, dict):
+        return {k: encode(v) for k, v in value.items()}
+    return value
+
+
+class Model:
+
+    __slots__ = ()
+
+    FIELDS = ()
+
+    # Attributes left out of to_item() while None (sparse index keys)
+    SPARSE = frozenset()
+
+    SUMMARY_FIELDS = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._defaults = tuple((f[0], f[3]) for f in cls.FIELDS)
+        cls._decoded = tuple((f[0], f[1], f[3]) for f in cls.FIELDS)
+        cls._stored = tuple((f[0], f[1]) for f in cls.FIELDS if f[1])
+        cls._api = tuple((f[0], f[2]) for f in cls.FIELDS if f[2])
+        cls._by_api = {f[2]: f for f in cls.FIELDS if f[2]}
+
+    def __init__(self, **values):
+        for attr, default in self._defaults:
+            setattr(self, attr, values.pop(attr, default))
+        if values:
+            raise TypeError(
+                f"Unknown {type(self).__name__} fields: {', '.join(values)}"
+            )
+
+    @classmethod
+    def from_item(cls, item):
+        obj = cls.__new__(cls)
+        for attr, key, default in cls._decoded:
+            value = item.get(key, default) if key else default
+            setattr(obj, attr, decode(value))
+        return obj
+
+    def to_item(self):
+        item = {}
+        for attr, key in self._stored:
+            value = getattr(self, attr)
+            if value is None and attr in self.SPARSE:
+                continue
+            item[key] = encode(value)
+        return item
+
+    @classmethod
+    def select(cls, api_keys):
+        """
+        Resolves API field names for to_dict(fields=...).
+        Returns (fields, item_keys): the storage attributes to read.
+        Raises KeyError on an unknown name.
+        """
+        selected = [cls._by_api[key] for key in dict.fromkeys(api_keys)]
+        fields = tuple((f[0], f[2]) for f in selected)
+        item_keys = [f[1] for f in selected if f[1]]
+        return fields, item_keys
+
+    def to_dict(self, fields=None):
+        """`fields` from select(); all API fields by default."""
+        return {api: getattr(self, attr) for attr, api in fields or self._api}
+
+    def __repr__(self):
+        key = self.FIELDS[0][0]
+        return f"<{type(self).__name__} {getattr(self, key)!r}>"
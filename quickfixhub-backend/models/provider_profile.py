@@ -1,23 +1,19 @@
-class ProviderProfile:
-    def __init__(
-        self,
-        provider_id,
-        service_types,
-        address,
-        is_verified,
-        created_at
-    ):
-        self.provider_id = provider_id        # FK → User.id
-        self.service_types = service_types    # list[str]
-        self.address = address                # REQUIRED
-        self.is_verified = is_verified        # False initially
-        self.created_at = created_at
+from models.base import Model
 
-    def to_dict(self):
-        return {
-            "providerId": self.provider_id,
-            "serviceTypes": self.service_types,
-            "address": self.address,
-            "isVerified": self.is_verified,
-            "createdAt": self.created_at
-        }
+
+class ProviderProfile(Model):
+
+    FIELDS = (
+        ("provider_id", "provider_id", "providerId", None),      # FK → User.id
+        ("service_types", "service_types", "serviceTypes", None),  # list[str]
+        ("address", "address", "address", None),                 # REQUIRED
+        ("lat", "lat", None, None),                              # utils/geo.py
+        ("lon", "lon", None, None),
+        ("geohash", "geohash", None, None),
+        ("is_verified", "is_verified", "isVerified", False),     # False initially
+        ("created_at", "created_at", "createdAt", None),
+    )
+
+    SPARSE = frozenset({"lat", "lon", "geohash"})
+
+    __slots__ = tuple(f[0] for f in FIELDS)
@@ -1,20 +1,16 @@
-class ServiceOffer:
-    def __init__(
-        self,
-        request_id,
-        provider_id,
-        status,         # offered | accepted | rejected | expired
-        created_at
-    ):
-        self.request_id = request_id
-        self.provider_id = provider_id
-        self.status = status
-        self.created_at = created_at
+from models.base import Model
 
-    def to_dict(self):
-        return {
-            "requestId": self.request_id,
-            "providerId": self.provider_id,
-            "status": self.status,
-            "createdAt": self.created_at
-        }
+
+class ServiceOffer(Model):
+
+    FIELDS = (
+        ("request_id", "request_id", "requestId", None),
+        ("provider_id", "provider_id", "providerId", None),
+        ("status", "status", "status", "offered"),  # offered | accepted | rejected | expired
+        ("summary", "summary", None, None),         # inbox copy of the request
+        ("created_at", "created_at", "createdAt", None),
+    )
+
+    SPARSE = frozenset({"summary"})
+
+    __slots__ = tuple(f[0] for f in FIELDS)
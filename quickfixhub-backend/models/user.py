@@ -1,20 +1,40 @@
-from flask_login import UserMixin
-
-class User(UserMixin):
-    def __init__(self,name, id, email, role, phone, created_at):
-        self.id = id
-        self.name = name
-        self.email = email
-        self.role = role
-        self.phone = phone
-        self.created_at = created_at
-
-    def to_dict(self):
-        return {
-            "id": self.id,
-            "name": self.name,
-            "email": self.email,
-            "role": self.role,
-            "phone": self.phone,
-            "createdAt": self.created_at
-        }
+from models.base import Model
+
+
+class User(Model):
+    """
+    Also the Flask-Login user (is_active / is_authenticated /
+    get_id are implemented here: UserMixin has no __slots__).
+    """
+
+    FIELDS = (
+        ("id", "user_id", "id", None),
+        ("name", "name", "name", None),
+        ("email", "email", "email", None),
+        ("password_hash", "password_hash", None, None),
+        ("role", "role", "role", None),             # homeowner | provider
+        ("phone", "phone", "phone", None),
+        ("created_at", "created_at", "createdAt", None),
+    )
+
+    SPARSE = frozenset({"password_hash"})
+
+    __slots__ = tuple(f[0] for f in FIELDS)
+
+    # ----------------------------------
+    # Flask-Login
+    # ----------------------------------
+    is_active = True
+    is_authenticated = True
+    is_anonymous = False
+
+    def get_id(self):
+        return str(self.id)
+
+    def __eq__(self, other):
+        if isinstance(other, User):
+            return self.id == other.id
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.id)
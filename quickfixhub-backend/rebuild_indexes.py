@@ -0,0 +1,29 @@
+# rebuild_indexes.py
+#
+# Backfills derived DynamoDB items from the source tables.
+# Safe to re-run.
+#
+#   python rebuild_indexes.py user-emails
+#   python rebuild_indexes.py all
+import argparse
+
+from db import dynamodb
+
+BACKFILLS = {
+    "user-emails": dynamodb.backfill_user_emails,
+    "provider-geo": dynamodb.backfill_provider_geo,
+    "provider-service-types": dynamodb.backfill_provider_service_types,
+    "provider-stats": dynamodb.backfill_provider_stats,
+    "offer-expiry": dynamodb.backfill_offer_expiry,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("index", choices=sorted(BACKFILLS) + ["all"])
+    args = parser.parse_args()
+
+    names = sorted(BACKFILLS) if args.index == "all" else [args.index]
+
+    for name in names:
+        print(f"Rebuilding {name}...")
+        print(f"  {BACKFILLS[name]()} items written")
@@ -1,24 +1,30 @@
 from flask import Blueprint, request, jsonify, session
 from flask_login import login_user, logout_user, login_required, current_user
-from extensions import bcrypt
 from models.user import User
+from models.provider_profile import ProviderProfile
 from datetime import datetime
 import uuid
 from utils.time_utils import now_iso
-from aws_app import send_sns
 
-from db.dynamodb import users_table, provider_profiles_table
-from boto3.dynamodb.conditions import Attr
+from db.repository import get_repository, ConditionFailed
+from services.notifications import notify
+from services.passwords import check_password, hash_password, needs_rehash
+from utils.geo import location_fields
 
 auth_bp = Blueprint("auth", __name__)
 
 
+def _profile_dict(item):
+    return ProviderProfile.from_item(item).to_dict() if item else None
+
+
 # ==========================================================
-# SIGNUP (NO GSI — SCAN FOR EMAIL)
+# SIGNUP
 # ==========================================================
 @auth_bp.route("/signup", methods=["POST"])
 def signup():
     data = request.get_json()
+    repo = get_repository()
 
     name = data.get("name")
     email = data.get("email")
@@ -32,33 +38,37 @@ def signup():
     if role not in ["homeowner", "provider"]:
         return {"success": False, "message": "Invalid role"}, 400
 
-    # ----------------------------------
-    # CHECK EMAIL UNIQUENESS (SCAN)
-    # ----------------------------------
-    existing = users_table.scan(
-        FilterExpression=Attr("email").eq(email)
-    )
+    service_types = data.get("serviceTypes")
+    address = data.get("address")
 
-    if existing.get("Items"):
-        return {"success": False, "message": "User already exists"}, 400
+    if role == "provider" and (
+        not service_types or not isinstance(service_types, list) or not address
+    ):
+        return {
+            "success": False,
+            "message": "Providers must specify serviceTypes and address"
+        }, 400
 
     user_id = str(uuid.uuid4())
     created_at = datetime.utcnow().isoformat()
 
     # ----------------------------------
-    # CREATE USER
+    # CREATE USER (email claim enforces uniqueness)
     # ----------------------------------
-    user_item = {
-        "user_id": user_id,  # PARTITION KEY
-        "name": name,
-        "email": email,
-        "password_hash": bcrypt.generate_password_hash(password).decode(),
-        "role": role,
-        "phone": phone,
-        "created_at": created_at,
-    }
+    user = User(
+        id=user_id,  # PARTITION KEY
+        name=name,
+        email=email,
+        password_hash=hash_password(password),
+        role=role,
+        phone=phone,
+        created_at=created_at,
+    )
 
-    users_table.put_item(Item=user_item)
+    try:
+        repo.create_user(user.to_item())
+    except ConditionFailed:
+        return {"success": False, "message": "User already exists"}, 400
 
     # ----------------------------------
     # PROVIDER PROFILE (IF NEEDED)
@@ -66,38 +76,20 @@ def signup():
     provider_profile = None
 
     if role == "provider":
-        service_types = data.get("serviceTypes")
-        address = data.get("address")
-
-        if not service_types or not isinstance(service_types, list) or not address:
-            users_table.delete_item(Key={"user_id": user_id})
-            return {
-                "success": False,
-                "message": "Providers must specify serviceTypes and address"
-            }, 400
-
-        provider_profile = {
-            "provider_id": user_id,  # PK of provider_profiles table
-            "service_types": service_types,
-            "address": address,
-            "is_verified": False,
-            "created_at": created_at,
-        }
+        provider_profile = ProviderProfile(
+            provider_id=user_id,  # PK of provider_profiles table
+            service_types=service_types,
+            address=address,
+            **location_fields(address),
+            is_verified=False,
+            created_at=created_at,
+        )
 
-        provider_profiles_table.put_item(Item=provider_profile)
+        repo.put_provider_profile(provider_profile.to_item())
 
     # ----------------------------------
     # AUTO LOGIN
     # ----------------------------------
-    user = User(
-        id=user_id,
-        name=name,
-        email=email,
-        role=role,
-        phone=phone,
-        created_at=created_at
-    )
-
     login_user(user)
     session["role"] = role
     session["user_id"] = user_id
@@ -108,17 +100,18 @@ def signup():
     }
 
     if provider_profile:
-        response["providerProfile"] = provider_profile
+        response["providerProfile"] = provider_profile.to_dict()
 
     return jsonify(response), 201
 
 
 # ==========================================================
-# LOGIN (SCAN VERSION — NO GSI)
+# LOGIN
 # ==========================================================
 @auth_bp.route("/login", methods=["POST"])
 def login():
     data = request.get_json()
+    repo = get_repository()
 
     email = data.get("email")
     password = data.get("password")
@@ -130,46 +123,41 @@ def login():
         }, 400
 
     # ----------------------------------
-    # SCAN FOR EMAIL
+    # LOOKUP BY EMAIL
     # ----------------------------------
-    res = users_table.scan(
-        FilterExpression=Attr("email").eq(email)
-    )
-
-    items = res.get("Items", [])
-    if not items:
+    user_item = repo.find_user_by_email(email)
+    if not user_item:
         return {"success": False, "message": "Invalid credentials"}, 401
 
-    user_item = items[0]
-
     # ----------------------------------
     # PASSWORD CHECK
     # ----------------------------------
-    if not bcrypt.check_password_hash(
-        user_item["password_hash"], password
-    ):
+    if not check_password(user_item.get("password_hash"), password):
         return {"success": False, "message": "Invalid credentials"}, 401
 
+    # Upgrade hashes made with a different work factor
+    if needs_rehash(user_item["password_hash"]):
+        try:
+            repo.update_user(
+                user_item["user_id"],
+                {"password_hash": hash_password(password)}
+            )
+        except ConditionFailed:
+            pass
+
     # ----------------------------------
     # LOGIN USER
     # ----------------------------------
-    user = User(
-        id=user_item["user_id"],
-        name=user_item["name"],
-        email=user_item["email"],
-        role=user_item["role"],
-        phone=user_item["phone"],
-        created_at=user_item["created_at"]
-    )
+    user = User.from_item(user_item)
 
     login_user(user)
     session["role"] = user.role
     session["user_id"] = user.id
 
     # ----------------------------------
-    # SNS LOGIN NOTIFICATION
+    # LOGIN NOTIFICATION (queued, sent off-thread)
     # ----------------------------------
-    send_sns(
+    notify(
         subject="User Login Event",
         message=(
             f"User logged in\n\n"
@@ -190,10 +178,9 @@ def login():
     }
 
     if user.role == "provider":
-        profile = provider_profiles_table.get_item(
-            Key={"provider_id": user.id}
-        ).get("Item")
-        response["providerProfile"] = profile
+        response["providerProfile"] = _profile_dict(
+            repo.get_provider_profile(user.id)
+        )
 
     return jsonify(response), 200
 
@@ -210,10 +197,9 @@ def me():
     }
 
     if current_user.role == "provider":
-        profile = provider_profiles_table.get_item(
-            Key={"provider_id": current_user.id}
-        ).get("Item")
-        response["providerProfile"] = profile
+        response["providerProfile"] = _profile_dict(
+            get_repository().get_provider_profile(current_user.id)
+        )
 
     return jsonify(response)
 
@@ -0,0 +1,17 @@
+from flask import Blueprint, Response
+
+from utils.metrics import prometheus_text
+
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+# ==========================================================
+# PROMETHEUS METRICS (this worker process only)
+# ==========================================================
+@metrics_bp.route("/metrics", methods=["GET"])
+def metrics():
+    return Response(
+        prometheus_text(),
+        mimetype="text/plain; version=0.0.4"
+    )
@@ -1,20 +1,52 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, current_app, request
 from flask_login import login_required, current_user
-from boto3.dynamodb.conditions import Attr
-import uuid
 
-from db.dynamodb import (
-    service_requests_table,
-    service_offers_table,
-)
+from db.repository import get_repository, AcceptConflict, ConditionFailed
+from models.service_request import ServiceRequest
 
-from services.provider_matcher import get_ranked_providers
-from services.offer_service import MAX_OFFER_ROUNDS
+from services.provider_matcher import get_ranked_providers, MAX_ACTIVE_JOBS
+from services.offer_service import (
+    MAX_OFFER_ROUNDS,
+    OfferWriteBatch,
+    expire_other_offers,
+    offer_request_to_providers,
+    request_owner,
+)
+from services.notifications import notify
+from services.events import publish
+from utils.pagination import InvalidPageArgs, fields_arg
+from utils.conditional import versioned_listing
+from utils.sse import event_stream
 from utils.time_utils import now_iso
+from utils.geo import item_location
 
 
 provider_bp = Blueprint("provider", __name__)
 
+ACCEPT_ERRORS = {
+    "offer": "No active offer",
+    "request": "Request is no longer available",
+    "capacity": "Too many active jobs",
+}
+
+STALE_REQUEST = "Request was changed; reload and try again"
+
+
+def _update_job(req, fields):
+    """
+    Writes a request update, bumping the listing versions of its
+    owner and assignee and notifying their streams (one transaction).
+    Returns the item as written. Raises ConditionFailed if the
+    request's status is no longer the one in `req`.
+    """
+    batch = OfferWriteBatch()
+    batch.update_request(
+        req["request_id"], fields, expected={"status": req["status"]}
+    )
+    batch.request_changed(req, fields["status"])
+    batch.commit()
+    return {**req, **fields}
+
 
 # =========================================================
 # DASHBOARD SUMMARY
@@ -25,28 +57,20 @@ def dashboard_summary():
     if current_user.role != "provider":
         return {"success": False}, 403
 
-    res = service_requests_table.scan(
-        FilterExpression=Attr("assigned_provider_id").eq(current_user.id)
-    )
-
-    completed = 0
-    active = 0
-    earnings = 0
+    # One point read of the incrementally maintained aggregates
+    stats = get_repository().get_provider_stats(current_user.id)
 
-    for req in res.get("Items", []):
-        if req["status"] == "completed":
-            completed += 1
-            earnings += 50
-        elif req["status"] in ["accepted", "in_progress"]:
-            active += 1
+    rating = 4.9
+    if stats["rating_count"]:
+        rating = round(stats["rating_total"] / stats["rating_count"], 1)
 
     return {
         "success": True,
         "stats": {
-            "jobsCompleted": completed,
-            "activeJobs": active,
-            "rating": 4.9,
-            "earnings": earnings,
+            "jobsCompleted": stats["jobs_completed"],
+            "activeJobs": stats["active_jobs"],
+            "rating": rating,
+            "earnings": stats["earnings"],
         },
     }
 
@@ -60,22 +84,41 @@ def available_jobs():
     if current_user.role != "provider":
         return {"success": False}, 403
 
-    offers = service_offers_table.scan(
-        FilterExpression=(
-            Attr("provider_id").eq(current_user.id)
-            & Attr("status").eq("offered")
-        )
-    ).get("Items", [])
+    return versioned_listing(current_user.id, _available_jobs)
+
+
+def _available_jobs():
+    repo = get_repository()
+
+    try:
+        fields, attributes = fields_arg(ServiceRequest, required=("request_id",))
+    except InvalidPageArgs as e:
+        return {"success": False, "message": str(e)}, 400
+
+    # One keyed query on the provider inbox index
+    offers = repo.list_offers_for_provider(current_user.id, status="offered")
+
+    # Full request items only when asked for, or for offers
+    # written before summaries existed (one BatchGetItem)
+    if request.args.get("details") == "full":
+        missing = [o["request_id"] for o in offers]
+    else:
+        missing = [o["request_id"] for o in offers if not o.get("summary")]
+
+    full = {
+        r["request_id"]: r
+        for r in repo.get_requests(missing, attributes=attributes)
+    } if missing else {}
 
     jobs = []
 
     for offer in offers:
-        req = service_requests_table.get_item(
-            Key={"request_id": offer["request_id"]}
-        ).get("Item")
+        job = full.get(offer["request_id"]) or offer.get("summary")
 
-        if req:
-            jobs.append(req)
+        if job:
+            req = ServiceRequest.from_item(job)
+            req.status = "offered"
+            jobs.append(req.to_dict(fields))
 
     return {"success": True, "jobs": jobs}
 
@@ -89,16 +132,37 @@ def my_jobs():
     if current_user.role != "provider":
         return {"success": False}, 403
 
-    res = service_requests_table.scan(
-        FilterExpression=(
-            Attr("assigned_provider_id").eq(current_user.id)
-            & Attr("status").is_in(
-                ["accepted", "in_progress", "completed"]
-            )
-        )
+    return versioned_listing(current_user.id, _my_jobs)
+
+
+def _my_jobs():
+    try:
+        fields, attributes = fields_arg(ServiceRequest)
+    except InvalidPageArgs as e:
+        return {"success": False, "message": str(e)}, 400
+
+    items = get_repository().list_requests_for_provider(
+        current_user.id,
+        statuses=["accepted", "in_progress", "completed"],
+        attributes=attributes,
     )
 
-    return {"success": True, "jobs": res.get("Items", [])}
+    jobs = [ServiceRequest.from_item(item).to_dict(fields) for item in items]
+
+    return {"success": True, "jobs": jobs}
+
+
+# =========================================================
+# EVENT STREAM
+# =========================================================
+@provider_bp.route("/events", methods=["GET"])
+@login_required
+def provider_events():
+    if current_user.role != "provider":
+        return {"success": False}, 403
+
+    # New / closed offers and changes to the caller's jobs
+    return event_stream(current_user.id)
 
 
 # =========================================================
@@ -110,72 +174,124 @@ def accept_offer(request_id):
     if current_user.role != "provider":
         return {"success": False}, 403
 
-    # Fetch offer using composite key
-    res = service_offers_table.get_item(
-        Key={
-            "request_id": request_id,
-            "provider_id": current_user.id
-        }
+    repo = get_repository()
+
+    # Open offers first: their summaries name the request's owner,
+    # whose listing version is bumped inside the accept itself
+    offers = repo.list_offers_for_request(request_id, status="offered")
+    owner = request_owner(request_id, offers)
+
+    # Offer, request, job slot and both listing versions in one
+    # conditional transaction: the offer and the request must still
+    # be open and the provider under MAX_ACTIVE_JOBS, so only one
+    # provider can ever win.
+    try:
+        repo.accept_offer(
+            request_id,
+            current_user.id,
+            {
+                "status": "accepted",
+                "assigned_provider_id": current_user.id,
+                "provider_name": current_user.name,
+                "provider_phone": current_user.phone,
+                "provider_email": current_user.email,
+                "offer_expires_at": None,
+                "updated_at": now_iso(),
+            },
+            MAX_ACTIVE_JOBS,
+            touch=(owner, current_user.id),
+        )
+    except AcceptConflict as e:
+        return {"success": False, "message": ACCEPT_ERRORS[e.reason]}, 400
+
+    publish([owner], "request.updated", requestId=request_id, status="accepted")
+    publish([current_user.id], "job.updated", requestId=request_id, status="accepted")
+
+    # Close the sibling offers (one batched follow-up write). Until
+    # then they cannot be accepted: the request is taken. A failure
+    # here must not turn the accept, already committed, into a 500.
+    try:
+        expire_other_offers(request_id, current_user.id, offers=offers)
+    except Exception as e:
+        print(f"Closing sibling offers of {request_id} failed:", e)
+
+    notify(
+        subject="Job Offer Accepted",
+        message=(
+            f"Service request accepted\n\n"
+            f"Request ID: {request_id}\n"
+            f"Provider: {current_user.name} ({current_user.email})\n"
+            f"Accepted At (UTC): {now_iso()}"
+        )
     )
 
-    offer = res.get("Item")
+    return {"success": True}
 
-    if not offer or offer["status"] != "offered":
-        return {"success": False, "message": "No active offer"}, 400
 
-    # Mark offer accepted
-    service_offers_table.update_item(
-        Key={
-            "request_id": request_id,
-            "provider_id": current_user.id
-        },
-        UpdateExpression="SET #s=:s",
-        ExpressionAttributeNames={"#s": "status"},
-        ExpressionAttributeValues={":s": "accepted"},
-    )
+# =========================================================
+# START JOB
+# =========================================================
+@provider_bp.route("/jobs/<request_id>/start", methods=["POST"])
+@login_required
+def start_job(request_id):
+    if current_user.role != "provider":
+        return {"success": False}, 403
 
-    # Update service request
-    service_requests_table.update_item(
-        Key={"request_id": request_id},
-        UpdateExpression="""
-            SET #s=:s,
-                assigned_provider_id=:pid,
-                provider_name=:pn,
-                provider_phone=:pp,
-                provider_email=:pe,
-                offer_expires_at=:null,
-                updated_at=:u
-        """,
-        ExpressionAttributeNames={"#s": "status"},
-        ExpressionAttributeValues={
-            ":s": "accepted",
-            ":pid": current_user.id,
-            ":pn": current_user.name,
-            ":pp": current_user.phone,
-            ":pe": current_user.email,
-            ":null": None,
-            ":u": now_iso(),
-        },
-    )
+    repo = get_repository()
+    req = repo.get_request(request_id)
 
-    # Expire other offers for same request
-    other_offers = service_offers_table.scan(
-        FilterExpression=Attr("request_id").eq(request_id)
-    ).get("Items", [])
-
-    for o in other_offers:
-        if o["provider_id"] != current_user.id and o["status"] == "offered":
-            service_offers_table.update_item(
-                Key={
-                    "request_id": request_id,
-                    "provider_id": o["provider_id"]
-                },
-                UpdateExpression="SET #s=:s",
-                ExpressionAttributeNames={"#s": "status"},
-                ExpressionAttributeValues={":s": "expired"},
-            )
+    if not req or req.get("assigned_provider_id") != current_user.id:
+        return {"success": False}, 404
 
-    return {"success": True}
+    if req["status"] != "accepted":
+        return {"success": False}, 400
+
+    try:
+        updated = _update_job(
+            req,
+            {"status": "in_progress", "updated_at": now_iso()}
+        )
+    except ConditionFailed:
+        return {"success": False, "message": STALE_REQUEST}, 409
+
+    return {"success": True, "job": ServiceRequest.from_item(updated).to_dict()}
+
+
+# =========================================================
+# COMPLETE JOB
+# =========================================================
+@provider_bp.route("/jobs/<request_id>/complete", methods=["POST"])
+@login_required
+def complete_job(request_id):
+    if current_user.role != "provider":
+        return {"success": False}, 403
+
+    repo = get_repository()
+    req = repo.get_request(request_id)
+
+    if not req or req.get("assigned_provider_id") != current_user.id:
+        return {"success": False}, 404
+
+    if req["status"] not in ["accepted", "in_progress"]:
+        return {"success": False}, 400
+
+    # Conditional on the status read: a cancel landing first has
+    # already released the slot
+    try:
+        updated = _update_job(
+            req,
+            {"status": "completed", "updated_at": now_iso()}
+        )
+    except ConditionFailed:
+        return {"success": False, "message": STALE_REQUEST}, 409
+
+    repo.release_provider_slot(
+        current_user.id,
+        completed=True,
+        earnings=current_app.config["EARNINGS_PER_JOB"]
+    )
+
+    return {"success": True, "job": ServiceRequest.from_item(updated).to_dict()}
 
 
 # =========================================================
@@ -187,113 +303,68 @@ def reject_offer(request_id):
     if current_user.role != "provider":
         return {"success": False}, 403
 
-    res = service_offers_table.get_item(
-        Key={
-            "request_id": request_id,
-            "provider_id": current_user.id
-        }
-    )
+    repo = get_repository()
 
-    offer = res.get("Item")
+    offer = repo.get_offer(request_id, current_user.id)
 
     if not offer or offer["status"] != "offered":
         return {"success": False}, 400
 
-    # Mark rejected
-    service_offers_table.update_item(
-        Key={
-            "request_id": request_id,
-            "provider_id": current_user.id
-        },
-        UpdateExpression="SET #s=:s",
-        ExpressionAttributeNames={"#s": "status"},
-        ExpressionAttributeValues={":s": "rejected"},
-    )
+    # Mark rejected (bumps this provider's listing version)
+    batch = OfferWriteBatch()
+    batch.set_offer_status(request_id, current_user.id, "rejected")
+    batch.commit()
 
-    req = service_requests_table.get_item(
-        Key={"request_id": request_id}
-    ).get("Item")
+    req = repo.get_request(request_id)
 
     if not req:
         return {"success": False}, 404
 
     # Check if other offers still active
-    active_offers = service_offers_table.scan(
-        FilterExpression=(
-            Attr("request_id").eq(request_id)
-            & Attr("status").eq("offered")
-        )
-    ).get("Items", [])
+    offers = repo.list_offers_for_request(request_id)
 
-    if active_offers:
+    if any(o["status"] == "offered" for o in offers):
         return {"success": True}
 
+    # The request writes below lose quietly to a concurrent cancel,
+    # accept or expiry pass: the rejection itself is already stored
+    try:
+        _close_out_after_reject(req, offers)
+    except ConditionFailed:
+        pass
+
+    return {"success": True}
+
+
+def _close_out_after_reject(req, offers):
+    # Already accepted / cancelled / closed: nothing to re-offer
+    if req["status"] != "offered":
+        return
+
     # Max rounds?
     if req["offer_round"] >= MAX_OFFER_ROUNDS:
-        service_requests_table.update_item(
-            Key={"request_id": request_id},
-            UpdateExpression="SET #s=:s, updated_at=:u",
-            ExpressionAttributeNames={"#s": "status"},
-            ExpressionAttributeValues={
-                ":s": "expired",
-                ":u": now_iso(),
-            },
-        )
-        return {"success": True}
+        _update_job(req, {"status": "expired", "updated_at": now_iso()})
+        return
 
     # Re-offer logic
+    contacted = {o["provider_id"] for o in offers}
+
     ranked = get_ranked_providers(
         req["service_type"],
         req["address"],
+        location=item_location(req),
+        exclude=contacted,
     )
 
-    contacted = {
-        o["provider_id"]
-        for o in service_offers_table.scan(
-            FilterExpression=Attr("request_id").eq(request_id)
-        ).get("Items", [])
-    }
-
     fresh = [pid for pid, _ in ranked if pid not in contacted]
 
     if not fresh:
-        service_requests_table.update_item(
-            Key={"request_id": request_id},
-            UpdateExpression="SET #s=:s, updated_at=:u",
-            ExpressionAttributeNames={"#s": "status"},
-            ExpressionAttributeValues={
-                ":s": "expired",
-                ":u": now_iso(),
-            },
-        )
-        return {"success": True}
+        _update_job(req, {"status": "expired", "updated_at": now_iso()})
+        return
 
     # Offer next batch
-    for pid in fresh[:3]:
-        service_offers_table.put_item(
-            Item={
-                "request_id": request_id,
-                "provider_id": pid,
-                "status": "offered",
-                "created_at": now_iso(),
-            }
-        )
-
-    service_requests_table.update_item(
-        Key={"request_id": request_id},
-        UpdateExpression="""
-            SET #s=:s,
-                offer_round=:r,
-                offer_expires_at=:e,
-                updated_at=:u
-        """,
-        ExpressionAttributeNames={"#s": "status"},
-        ExpressionAttributeValues={
-            ":s": "offered",
-            ":r": req["offer_round"] + 1,
-            ":e": now_iso(),
-            ":u": now_iso(),
-        },
+    offer_request_to_providers(
+        req,
+        fresh[:3],
+        expected={"status": req["status"], "offer_round": req["offer_round"]},
     )
-
-    return {"success": True}
@@ -1,22 +1,31 @@
 from flask import Blueprint, request
 from flask_login import login_required, current_user
-from boto3.dynamodb.conditions import Attr
 import uuid
 
-from db.dynamodb import (
-    service_requests_table,
-    service_offers_table
-)
+from db.repository import ConditionFailed, get_repository
+from models.service_request import ServiceRequest
 
 from services.provider_matcher import get_ranked_providers
-from services.offer_service import offer_request_to_providers
-from services.timeout_service import handle_expired_offers
-from utils.time_utils import now_iso
+from utils.geo import item_location, location_fields
+from services.offer_service import (
+    OfferWriteBatch,
+    offer_request_to_providers,
+    expire_open_offers,
+)
+from services.timeout_service import is_offer_expired
+from utils.time_utils import now_iso, now_epoch
+from utils.pagination import InvalidPageArgs, fields_arg, paged_response
+from utils.conditional import versioned_listing
+from utils.sse import event_stream
 
 
 service_bp = Blueprint("service", __name__)
 
 
+def request_dict(item, fields=None):
+    return ServiceRequest.from_item(item).to_dict(fields)
+
+
 # ==========================================================
 # CREATE SERVICE REQUEST
 # ==========================================================
@@ -24,6 +33,7 @@ service_bp = Blueprint("service", __name__)
 @login_required
 def create_service_request():
     data = request.get_json()
+    repo = get_repository()
 
     required = ["serviceType", "description", "address", "preferredDate"]
     for field in required:
@@ -33,47 +43,43 @@ def create_service_request():
     now = now_iso()
     request_id = str(uuid.uuid4())
 
-    request_item = {
-        "request_id": request_id,
-        "user_id": current_user.id,
-        "user_name": current_user.name,
-        "user_email": current_user.email,
-        "user_phone": current_user.phone,
-        "service_type": data["serviceType"],
-        "description": data["description"],
-        "address": data["address"],
-        "preferred_date": data["preferredDate"],
-        "preferred_time": data.get("preferredTime"),
-        "status": "pending",
-        "assigned_provider_id": None,
-        "offer_round": 0,
-        "offer_expires_at": None,
-        "created_at": now,
-        "updated_at": now,
-    }
-
-    service_requests_table.put_item(Item=request_item)
+    request_item = ServiceRequest(
+        id=request_id,
+        user_id=current_user.id,
+        user_name=current_user.name,
+        user_email=current_user.email,
+        user_phone=current_user.phone,
+        service_type=data["serviceType"],
+        description=data["description"],
+        address=data["address"],
+        **location_fields(data["address"]),
+        preferred_date=data["preferredDate"],
+        preferred_time=data.get("preferredTime"),
+        status="pending",
+        created_at=now,
+        updated_at=now,
+    ).to_item()
+
+    repo.put_request(request_item)
 
     ranked = get_ranked_providers(
         service_type=request_item["service_type"],
-        address=request_item["address"]
+        address=request_item["address"],
+        location=item_location(request_item),
     )
 
     provider_ids = [pid for pid, _ in ranked[:3]]
 
     if provider_ids:
-        offer_request_to_providers(request_item, provider_ids)
+        request_item = offer_request_to_providers(request_item, provider_ids)
     else:
-        service_requests_table.update_item(
-            Key={"request_id": request_id},
-            UpdateExpression="SET #s=:s",
-            ExpressionAttributeNames={"#s": "status"},
-            ExpressionAttributeValues={":s": "expired"}
-        )
-
-    res = service_requests_table.get_item(Key={"request_id": request_id})
+        batch = OfferWriteBatch()
+        batch.update_request(request_id, {"status": "expired"})
+        batch.request_changed(request_item, "expired")
+        batch.commit()
+        request_item = {**request_item, "status": "expired"}
 
-    return {"success": True, "request": res["Item"]}, 201
+    return {"success": True, "request": request_dict(request_item)}, 201
 
 
 # ==========================================================
@@ -82,13 +88,47 @@ def create_service_request():
 @service_bp.route("/my-requests", methods=["GET"])
 @login_required
 def get_my_requests():
-    handle_expired_offers()
+    # 304 on an unchanged version, without reading any request
+    return versioned_listing(current_user.id, _my_requests)
+
+
+def _my_requests():
+    repo = get_repository()
+    user_id = current_user.id
+    now = now_epoch()
 
-    res = service_requests_table.scan(
-        FilterExpression=Attr("user_id").eq(current_user.id)
+    try:
+        fields, attributes = fields_arg(
+            ServiceRequest, required=("status", "offer_expires_epoch")
+        )
+    except InvalidPageArgs as e:
+        return {"success": False, "message": str(e)}, 400
+
+    # Expiry itself runs on the background worker; here we only
+    # flag offers whose deadline has already passed.
+    def flag_expired(item):
+        req = ServiceRequest.from_item(item)
+        req.offer_expired = is_offer_expired(item, now)
+        return req.to_dict(fields)
+
+    return paged_response(
+        lambda limit, start: repo.page_requests_for_user(
+            user_id, limit, start, attributes=attributes
+        ),
+        "requests",
+        transform=flag_expired,
+        default_limit=None,
     )
 
-    return {"success": True, "requests": res.get("Items", [])}
+
+# ==========================================================
+# EVENT STREAM
+# ==========================================================
+@service_bp.route("/events", methods=["GET"])
+@login_required
+def request_events():
+    # Changes to the caller's requests, pushed as they commit
+    return event_stream(current_user.id)
 
 
 # ==========================================================
@@ -97,8 +137,20 @@ def get_my_requests():
 @service_bp.route("/all", methods=["GET"])
 @login_required
 def get_all_requests():
-    res = service_requests_table.scan()
-    return {"success": True, "requests": res.get("Items", [])}
+    repo = get_repository()
+
+    try:
+        fields, attributes = fields_arg(ServiceRequest)
+    except InvalidPageArgs as e:
+        return {"success": False, "message": str(e)}, 400
+
+    return paged_response(
+        lambda limit, start: repo.page_requests(
+            limit, start, attributes=attributes
+        ),
+        "requests",
+        transform=lambda item: request_dict(item, fields),
+    )
 
 
 # ==========================================================
@@ -107,12 +159,9 @@ def get_all_requests():
 @service_bp.route("/requests/<request_id>/cancel", methods=["POST"])
 @login_required
 def cancel_service_request(request_id):
+    repo = get_repository()
 
-    res = service_requests_table.get_item(
-        Key={"request_id": request_id}
-    )
-
-    req = res.get("Item")
+    req = repo.get_request(request_id)
     if not req:
         return {"success": False}, 404
 
@@ -122,36 +171,31 @@ def cancel_service_request(request_id):
     if req["status"] in ["in_progress", "completed", "expired", "cancelled"]:
         return {"success": False}, 400
 
-    # Cancel request
-    service_requests_table.update_item(
-        Key={"request_id": request_id},
-        UpdateExpression="SET #s=:s",
-        ExpressionAttributeNames={"#s": "status"},
-        ExpressionAttributeValues={":s": "cancelled"}
-    )
-
-    # Expire offers (NO offer_id used)
-    offers = service_offers_table.scan(
-        FilterExpression=Attr("request_id").eq(request_id)
-    ).get("Items", [])
-
-    for offer in offers:
-        if offer["status"] == "offered":
-            service_offers_table.update_item(
-                Key={
-                    "request_id": request_id,
-                    "provider_id": offer["provider_id"]
-                },
-                UpdateExpression="SET #s=:s",
-                ExpressionAttributeNames={"#s": "status"},
-                ExpressionAttributeValues={":s": "expired"}
-            )
-
-    updated = service_requests_table.get_item(
-        Key={"request_id": request_id}
+    # Cancel request + expire offers in one transaction, only while
+    # the request is still in the status read above
+    batch = OfferWriteBatch()
+    batch.update_request(
+        request_id, {"status": "cancelled"}, expected={"status": req["status"]}
     )
+    batch.request_changed(req, "cancelled")
+    expire_open_offers(request_id, batch)
+    try:
+        batch.commit()
+    except ConditionFailed:
+        # e.g. accepted or completed in the meantime
+        return {
+            "success": False,
+            "message": "Request was changed; reload and try again",
+        }, 409
+
+    updated = {**req, "status": "cancelled"}
+
+    # Free the provider's job slot. The write above succeeded, so
+    # req["status"] is the status the cancel replaced.
+    if req["status"] == "accepted" and req.get("assigned_provider_id"):
+        repo.release_provider_slot(req["assigned_provider_id"])
 
     return {
         "success": True,
-        "request": updated["Item"]
+        "request": request_dict(updated)
     }
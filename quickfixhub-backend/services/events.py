@@ -0,0 +1,170 @@
+import queue
+import threading
+
+from config import Config
+
+
+# ==========================================================
+# FAN-OUT
+# ==========================================================
+# A fan-out carries published messages to every app process.
+# start(deliver) runs once; the fan-out then calls deliver(message)
+# for each message published anywhere, this process included.
+#
+# Only the local stand-in ships here. A cross-process fan-out
+# (Redis pub/sub, an SNS topic with per-instance SQS queues, ...)
+# implements the same three methods.
+
+class LocalFanout:
+    """In-process stand-in: delivers straight to this process."""
+
+    def __init__(self):
+        self._deliver = None
+
+    def start(self, deliver):
+        self._deliver = deliver
+
+    def publish(self, message):
+        self._deliver(message)
+
+    def stop(self):
+        pass
+
+
+# ==========================================================
+# SUBSCRIPTIONS
+# ==========================================================
+class Subscription:
+    """
+    One open event stream. Bounded: a client that stops reading
+    loses events and is told to resync (refetch its listings).
+    """
+
+    def __init__(self, user_id, queue_size):
+        self.user_id = user_id
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout):
+        """Next (event, data), or None after `timeout` seconds."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def reset(self):
+        """Drops queued events and the overflow flag (before a resync)."""
+        self.overflowed = False
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                return
+
+
+# ==========================================================
+# BUS
+# ==========================================================
+class EventBus:
+    """
+    user_id → open subscriptions, fed through the fan-out.
+
+    publish() never blocks on a subscriber: events are queued per
+    subscription and written by the stream that owns it.
+    """
+
+    def __init__(self, fanout, queue_size=100):
+        self.fanout = fanout
+        self.queue_size = queue_size
+        self.lock = threading.Lock()
+        self.subscriptions = {}
+
+        self.published = 0
+        self.delivered = 0
+
+        fanout.start(self._deliver)
+
+    def subscribe(self, user_id):
+        sub = Subscription(user_id, self.queue_size)
+        with self.lock:
+            self.subscriptions.setdefault(user_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self.lock:
+            subs = self.subscriptions.get(sub.user_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self.subscriptions[sub.user_id]
+
+    def publish(self, user_ids, event, data):
+        user_ids = [uid for uid in dict.fromkeys(user_ids) if uid]
+        if not user_ids:
+            return
+        with self.lock:
+            self.published += 1
+        self.fanout.publish({"users": user_ids, "event": event, "data": data})
+
+    def _deliver(self, message):
+        with self.lock:
+            targets = [
+                sub
+                for user_id in message["users"]
+                for sub in self.subscriptions.get(user_id, ())
+            ]
+            self.delivered += len(targets)
+
+        for sub in targets:
+            sub.put((message["event"], message["data"]))
+
+    def stats(self):
+        with self.lock:
+            return {
+                "fanout": type(self.fanout).__name__,
+                "users": len(self.subscriptions),
+                "streams": sum(len(s) for s in self.subscriptions.values()),
+                "published": self.published,
+                "delivered": self.delivered,
+            }
+
+
+# ==========================================================
+# MODULE-LEVEL BUS
+# ==========================================================
+#   "local" → LocalFanout (single process / development)
+
+_bus = None
+
+
+def create_event_bus(fanout_name):
+    if fanout_name == "local":
+        fanout = LocalFanout()
+    else:
+        raise ValueError(f"Unknown event fan-out: {fanout_name}")
+
+    return EventBus(fanout, queue_size=Config.EVENT_QUEUE_SIZE)
+
+
+def set_event_bus(bus):
+    global _bus
+    _bus = bus
+    return bus
+
+
+def get_event_bus():
+    global _bus
+    if _bus is None:
+        _bus = create_event_bus(Config.EVENT_FANOUT)
+    return _bus
+
+
+def publish(user_ids, event, **data):
+    """Pushes `event` to the open streams of `user_ids`; never blocks."""
+    get_event_bus().publish(user_ids, event, data)
@@ -0,0 +1,304 @@
+import atexit
+import os
+import queue
+import threading
+import time
+import uuid
+
+from config import Config
+
+
+# ==========================================================
+# SINKS
+# ==========================================================
+# A sink publishes a list of {"subject", "message"} dicts and
+# returns the ones that failed (to be retried). start() runs on
+# the caller's thread before the workers are spawned.
+
+class SNSSink:
+    """Publishes to the SNS topic, up to 10 messages per PublishBatch."""
+
+    max_batch = 10
+
+    def __init__(self, topic_arn):
+        self.topic_arn = topic_arn
+        self._client = None
+
+    def start(self):
+        # Shared per-process client (utils/aws.py)
+        from utils.aws import get_client
+        self._client = get_client("sns")
+
+    def publish(self, messages):
+        if not self.topic_arn:
+            return []
+
+        entries = {}
+        for message in messages:
+            entries[uuid.uuid4().hex] = message
+
+        try:
+            res = self._client.publish_batch(
+                TopicArn=self.topic_arn,
+                PublishBatchRequestEntries=[
+                    {
+                        "Id": entry_id,
+                        "Subject": m["subject"],
+                        "Message": m["message"],
+                    }
+                    for entry_id, m in entries.items()
+                ],
+            )
+        except Exception as e:
+            print("SNS publish error:", e)
+            return messages
+
+        return [entries[f["Id"]] for f in res.get("Failed", [])]
+
+
+class LogSink:
+    """Prints notifications (local development)."""
+
+    max_batch = 10
+
+    def start(self):
+        pass
+
+    def publish(self, messages):
+        for m in messages:
+            print(f"[notification] {m['subject']}: {m['message']}")
+        return []
+
+
+class MemorySink:
+    """Keeps published notifications in a list (tests / benchmarks)."""
+
+    max_batch = 10
+
+    def __init__(self):
+        self.messages = []
+        self.lock = threading.Lock()
+
+    def start(self):
+        pass
+
+    def publish(self, messages):
+        with self.lock:
+            self.messages.extend(messages)
+        return []
+
+
+# ==========================================================
+# DISPATCHER
+# ==========================================================
+class NotificationDispatcher:
+    """
+    Bounded in-process queue drained by a small worker pool.
+
+    notify() never blocks: when the queue is full the message is
+    dropped and counted. Workers publish in batches and retry
+    failed messages with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        sink,
+        queue_size=1000,
+        workers=2,
+        max_retries=3,
+        backoff_seconds=0.5,
+    ):
+        self.sink = sink
+        self.queue_size = queue_size
+        self.worker_count = workers
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+
+        self.metrics_lock = threading.Lock()
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.retried = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    # ----------------------------------
+    # Lifecycle (lazy, once per process)
+    # ----------------------------------
+    def _ensure_started(self):
+        if self._pid == os.getpid():
+            return
+
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+
+            # Fresh queue/threads after a fork: the parent's threads
+            # do not exist in the child.
+            self.sink.start()
+            self.queue = queue.Queue(maxsize=self.queue_size)
+            self.threads = [
+                threading.Thread(
+                    target=self._run,
+                    name=f"notifications-{i}",
+                    daemon=True,
+                )
+                for i in range(self.worker_count)
+            ]
+            for thread in self.threads:
+                thread.start()
+            self._pid = os.getpid()
+
+    def stop(self, timeout=5.0):
+        """Waits (up to `timeout`) for queued messages to go out."""
+        if self._pid != os.getpid():
+            return
+
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    # ----------------------------------
+    # Producer side
+    # ----------------------------------
+    def notify(self, subject, message):
+        self._ensure_started()
+
+        try:
+            self.queue.put_nowait({
+                "subject": subject,
+                "message": message,
+                "enqueued_at": time.monotonic(),
+                "attempts": 0,
+            })
+            return True
+        except queue.Full:
+            with self.metrics_lock:
+                self.dropped += 1
+            return False
+
+    # ----------------------------------
+    # Worker side
+    # ----------------------------------
+    def _next_batch(self):
+        batch = [self.queue.get()]
+        while len(batch) < self.sink.max_batch:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._publish(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def _publish(self, batch):
+        pending = batch
+
+        while pending:
+            failed = self.sink.publish(pending)
+            failed_ids = {id(m) for m in failed}
+            now = time.monotonic()
+
+            with self.metrics_lock:
+                for m in pending:
+                    if id(m) not in failed_ids:
+                        latency = now - m["enqueued_at"]
+                        self.sent += 1
+                        self.latency_total += latency
+                        self.latency_max = max(self.latency_max, latency)
+
+            retry = []
+            for m in failed:
+                m["attempts"] += 1
+                if m["attempts"] > self.max_retries:
+                    with self.metrics_lock:
+                        self.failed += 1
+                else:
+                    retry.append(m)
+
+            if retry:
+                with self.metrics_lock:
+                    self.retried += len(retry)
+                attempts = max(m["attempts"] for m in retry)
+                time.sleep(self.backoff_seconds * 2 ** (attempts - 1))
+
+            pending = retry
+
+    # ----------------------------------
+    # Metrics
+    # ----------------------------------
+    def stats(self):
+        with self.metrics_lock:
+            return {
+                "sent": self.sent,
+                "failed": self.failed,
+                "dropped": self.dropped,
+                "retried": self.retried,
+                "queued": self.queue.qsize() if self._pid else 0,
+                "latency_avg_ms": (
+                    round(self.latency_total / self.sent * 1000, 2)
+                    if self.sent else 0.0
+                ),
+                "latency_max_ms": round(self.latency_max * 1000, 2),
+            }
+
+
+# ==========================================================
+# MODULE-LEVEL DISPATCHER
+# ==========================================================
+#   "sns"    → SNSSink (AWS)
+#   "log"    → LogSink (local)
+#   "memory" → MemorySink (tests / benchmarks)
+
+_dispatcher = None
+
+
+def create_dispatcher(sink_name):
+    if sink_name == "sns":
+        sink = SNSSink(Config.SNS_TOPIC_ARN)
+    elif sink_name == "log":
+        sink = LogSink()
+    elif sink_name == "memory":
+        sink = MemorySink()
+    else:
+        raise ValueError(f"Unknown notification sink: {sink_name}")
+
+    return NotificationDispatcher(
+        sink,
+        queue_size=Config.NOTIFICATION_QUEUE_SIZE,
+        workers=Config.NOTIFICATION_WORKERS,
+    )
+
+
+def set_dispatcher(dispatcher):
+    global _dispatcher
+    _dispatcher = dispatcher
+    return dispatcher
+
+
+def get_dispatcher():
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = create_dispatcher(Config.NOTIFICATION_SINK)
+    return _dispatcher
+
+
+def notify(subject, message):
+    """Queues a notification; never blocks the caller."""
+    return get_dispatcher().notify(subject, message)
+
+
+@atexit.register
+def _flush_on_exit():
+    if _dispatcher is not None:
+        _dispatcher.stop(timeout=2.0)
@@ -1,26 +1,150 @@
 from datetime import datetime, timedelta, timezone
-from boto3.dynamodb.conditions import Key
 
 from utils.time_utils import now_iso
-from db.dynamodb import service_offers_table, service_requests_table
+from db.repository import get_repository
+from models.service_offer import ServiceOffer
+from services.notifications import notify
+from services.events import publish
 
 
 OFFER_TIMEOUT_MINUTES = 15
 MAX_OFFER_ROUNDS = 3
 
+# DynamoDB transaction size used per flush
+BATCH_SIZE = 25
+
+# Request fields copied onto each offer for the provider inbox:
+# every field an offered request shows, so jobs served from the
+# summary look the same as jobs read from the request itself
+INBOX_SUMMARY_FIELDS = [
+    "request_id",
+    "user_id",
+    "user_name",
+    "user_email",
+    "user_phone",
+    "service_type",
+    "description",
+    "address",
+    "preferred_date",
+    "preferred_time",
+    "offer_round",
+    "offer_expires_at",
+    "created_at",
+    "updated_at",
+]
+
+
+# ==========================================================
+# BATCH WRITER
+# ==========================================================
+class OfferWriteBatch:
+    """
+    Collects offer puts, offer status flips and request updates,
+    then writes them as TransactWriteItems chunks of BATCH_SIZE.
+    A fan-out round or a request close-out is one round trip.
+
+    Every user whose listings change gets their change version
+    bumped (listing ETags, utils/conditional.py) and an event on
+    their open streams (services/events.py), published once the
+    writes are committed. Offer writes do both for their provider;
+    request writes don't know the request's owner / assignee, so
+    callers report them with request_changed().
+    """
+
+    def __init__(self):
+        self.ops = []
+        self.touched = {}
+        self.events = []
+
+    def __len__(self):
+        return len(self.ops)
+
+    def put_offer(self, item):
+        self.ops.append(("put_offer", item))
+        self.touch(item["provider_id"])
+        self.publish(
+            [item["provider_id"]], "offer.created",
+            requestId=item["request_id"], status=item["status"],
+        )
+
+    def set_offer_status(self, request_id, provider_id, status):
+        self.ops.append(("set_offer_status", request_id, provider_id, status))
+        self.touch(provider_id)
+        self.publish(
+            [provider_id], "offer.updated",
+            requestId=request_id, status=status,
+        )
+
+    def update_request(self, request_id, fields, increments=None, expected=None):
+        """
+        `expected` → attribute values the request must still hold;
+        commit() raises ConditionFailed otherwise. Conditional
+        updates go in the first transaction, so a lost race
+        writes nothing.
+        """
+        op = ("update_request", request_id, fields, increments, expected)
+        if expected:
+            self.ops.insert(0, op)
+        else:
+            self.ops.append(op)
+
+    def request_changed(self, request_item, status):
+        """Touches the request's owner / assignee and queues their events."""
+        owner = request_item.get("user_id")
+        assignee = request_item.get("assigned_provider_id")
+        data = {"requestId": request_item["request_id"], "status": status}
+
+        self.touch(owner, assignee)
+        self.publish([owner], "request.updated", **data)
+        self.publish([assignee], "job.updated", **data)
+
+    def touch(self, *user_ids):
+        for user_id in user_ids:
+            if user_id:
+                self.touched[user_id] = None
+
+    def publish(self, user_ids, event, **data):
+        self.events.append((user_ids, event, data))
+
+    def commit(self):
+        # Version bumps go last: never ahead of the data they cover
+        ops = self.ops + [("bump_version", uid) for uid in self.touched]
+        repo = get_repository()
+        for start in range(0, len(ops), BATCH_SIZE):
+            repo.transact_write(ops[start:start + BATCH_SIZE])
+
+        for user_ids, event, data in self.events:
+            publish(user_ids, event, **data)
+
+        self.ops = []
+        self.touched = {}
+        self.events = []
+
 
 # ==========================================================
 # CREATE OFFER (PK: request_id, SK: provider_id)
 # ==========================================================
-def create_offer(request_id, provider_id):
-    item = {
-        "request_id": request_id,
-        "provider_id": provider_id,
-        "status": "offered",
-        "created_at": now_iso(),
+def request_summary(service_request_item):
+    return {
+        field: service_request_item.get(field)
+        for field in INBOX_SUMMARY_FIELDS
     }
 
-    service_offers_table.put_item(Item=item)
+
+def new_offer_item(request_id, provider_id, created_at=None, summary=None):
+    return ServiceOffer(
+        request_id=request_id,
+        provider_id=provider_id,
+        status="offered",
+        summary=summary or None,
+        created_at=created_at or now_iso(),
+    ).to_item()
+
+
+def create_offer(request_id, provider_id, summary=None):
+    item = new_offer_item(request_id, provider_id, summary=summary)
+
+    get_repository().put_offer(item)
     return item
 
 
@@ -28,14 +152,7 @@ def create_offer(request_id, provider_id):
 # GET ACTIVE OFFER
 # ==========================================================
 def get_active_offer(request_id, provider_id):
-    res = service_offers_table.get_item(
-        Key={
-            "request_id": request_id,
-            "provider_id": provider_id
-        }
-    )
-
-    item = res.get("Item")
+    item = get_repository().get_offer(request_id, provider_id)
     if item and item["status"] == "offered":
         return item
 
@@ -45,59 +162,110 @@ def get_active_offer(request_id, provider_id):
 # ==========================================================
 # EXPIRE OTHER OFFERS (when one provider accepts)
 # ==========================================================
-def expire_other_offers(request_id, accepted_provider_id):
-    res = service_offers_table.query(
-        KeyConditionExpression=Key("request_id").eq(request_id)
-    )
+def expire_other_offers(request_id, accepted_provider_id, batch=None, offers=None):
+    """
+    Queues "expired" flips for every open offer except the
+    accepted one. Commits immediately unless a batch is passed.
+    `offers` → the request's open offers, when already read.
+    """
+    own_batch = batch is None
+    batch = batch if batch is not None else OfferWriteBatch()
+
+    if offers is None:
+        offers = get_repository().list_offers_for_request(
+            request_id, status="offered"
+        )
+
+    for offer in offers:
+        if offer["provider_id"] != accepted_provider_id:
+            batch.set_offer_status(request_id, offer["provider_id"], "expired")
+
+    if own_batch:
+        batch.commit()
 
-    for offer in res.get("Items", []):
-        if (
-            offer["provider_id"] != accepted_provider_id
-            and offer["status"] == "offered"
-        ):
-            service_offers_table.update_item(
-                Key={
-                    "request_id": request_id,
-                    "provider_id": offer["provider_id"]
-                },
-                UpdateExpression="SET #s = :expired",
-                ExpressionAttributeNames={"#s": "status"},
-                ExpressionAttributeValues={":expired": "expired"}
-            )
+    return offers
+
+
+def request_owner(request_id, offers):
+    """
+    user_id of the request, from its offers' inbox summaries
+    (one GetItem for offers written before summaries carried it).
+    """
+    for offer in offers:
+        owner = (offer.get("summary") or {}).get("user_id")
+        if owner:
+            return owner
+
+    req = get_repository().get_request(request_id)
+    return req["user_id"] if req else None
+
+
+# ==========================================================
+# EXPIRE ALL OPEN OFFERS (cancel / timeout)
+# ==========================================================
+def expire_open_offers(request_id, batch=None):
+    return expire_other_offers(request_id, None, batch)
 
 
 # ==========================================================
 # OFFER REQUEST TO PROVIDERS
 # ==========================================================
-def offer_request_to_providers(service_request_item, provider_ids):
+def offer_request_to_providers(service_request_item, provider_ids, batch=None,
+                               expected=None):
     """
     service_request_item must be DynamoDB dict item,
     not local object.
+
+    Offers and the request update go out in one transaction
+    (together with anything already queued on `batch`).
+    `expected` conditions the request update (ConditionFailed).
+    Returns the request item as written.
     """
 
+    batch = batch if batch is not None else OfferWriteBatch()
+    request_id = service_request_item["request_id"]
+    now = now_iso()
+
     expires_at = (
         datetime.now(timezone.utc) +
         timedelta(minutes=OFFER_TIMEOUT_MINUTES)
     ).isoformat()
 
-    # Create offers
+    # Update request state
+    fields = {
+        "status": "offered",
+        "offer_expires_at": expires_at,
+        "updated_at": now,
+    }
+    offer_round = service_request_item.get("offer_round", 0) + 1
+
+    # Create offers (each carries the inbox summary, as of this round)
+    summary = request_summary(
+        {**service_request_item, **fields, "offer_round": offer_round}
+    )
     for provider_id in provider_ids:
-        create_offer(service_request_item["request_id"], provider_id)
-
-    # Update request state in DynamoDB
-    service_requests_table.update_item(
-        Key={"request_id": service_request_item["request_id"]},
-        UpdateExpression="""
-            SET #s = :s,
-                offer_round = offer_round + :inc,
-                offer_expires_at = :exp,
-                updated_at = :u
-        """,
-        ExpressionAttributeNames={"#s": "status"},
-        ExpressionAttributeValues={
-            ":s": "offered",
-            ":inc": 1,
-            ":exp": expires_at,
-            ":u": now_iso()
-        }
+        batch.put_offer(new_offer_item(request_id, provider_id, now, summary))
+
+    batch.update_request(
+        request_id, fields, increments={"offer_round": 1}, expected=expected
+    )
+    batch.request_changed(service_request_item, "offered")
+    batch.commit()
+
+    notify(
+        subject="New Job Offer",
+        message=(
+            f"Service request offered\n\n"
+            f"Request ID: {request_id}\n"
+            f"Service: {service_request_item.get('service_type')}\n"
+            f"Round: {offer_round}\n"
+            f"Providers: {', '.join(provider_ids)}\n"
+            f"Offer Expires (UTC): {expires_at}"
+        )
     )
+
+    return {
+        **service_request_item,
+        **fields,
+        "offer_round": offer_round,
+    }
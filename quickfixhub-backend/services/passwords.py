@@ -0,0 +1,136 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+
+from config import Config
+
+
+# ==========================================================
+# HASHING (runs inside the pool processes)
+# ==========================================================
+# Hashes are standard "$2b$<cost>$..." strings, the same format
+# Flask-Bcrypt produced, so existing users keep working.
+#
+# bcrypt only reads the first 72 bytes of a password. Older
+# releases truncated silently, bcrypt 5 raises ValueError instead;
+# truncating here keeps long passwords working and still matches
+# hashes stored by the old behaviour.
+BCRYPT_MAX_BYTES = 72
+
+
+def _encode(password):
+    return password.encode("utf-8")[:BCRYPT_MAX_BYTES]
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(
+        _encode(password), bcrypt.gensalt(rounds)
+    ).decode("utf-8")
+
+
+def _check(password_hash, password):
+    try:
+        return bcrypt.checkpw(
+            _encode(password), password_hash.encode("utf-8")
+        )
+    except ValueError:
+        # Malformed / non-bcrypt hash
+        return False
+
+
+def hash_cost(password_hash):
+    """Work factor stored in a bcrypt hash ("$2b$12$..." → 12)."""
+    try:
+        return int(password_hash.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def needs_rehash(password_hash, rounds=None):
+    return hash_cost(password_hash) != (rounds or Config.BCRYPT_LOG_ROUNDS)
+
+
+# ==========================================================
+# PROCESS POOL
+# ==========================================================
+# bcrypt holds a CPU for ~tens of ms per call. Running it in a
+# separate process keeps the web worker free to serve other
+# requests while a login burst is being hashed.
+#
+# BCRYPT_POOL_SIZE=0 hashes inline on the calling thread.
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def _mp_context():
+    # "fork" starts the pool without re-importing the app module;
+    # the children only ever run _hash / _check.
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def get_pool():
+    """Process pool for this process (recreated after a fork)."""
+    global _pool, _pool_pid
+
+    if Config.BCRYPT_POOL_SIZE <= 0:
+        return None
+
+    if _pool_pid == os.getpid():
+        return _pool
+
+    with _pool_lock:
+        if _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(
+                max_workers=Config.BCRYPT_POOL_SIZE,
+                mp_context=_mp_context(),
+            )
+            _pool_pid = os.getpid()
+
+    return _pool
+
+
+def start_pool():
+    """
+    Spawns the pool processes up front. Call before starting
+    background threads so the pool forks a single-threaded parent.
+    """
+    pool = get_pool()
+    if pool is not None:
+        pool.submit(hash_cost, "").result()
+
+
+def shutdown_pool():
+    global _pool, _pool_pid
+
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(wait=True)
+        _pool = None
+        _pool_pid = None
+
+
+def _run(fn, *args):
+    pool = get_pool()
+    if pool is None:
+        return fn(*args)
+    return pool.submit(fn, *args).result()
+
+
+# ==========================================================
+# PUBLIC API
+# ==========================================================
+def hash_password(password, rounds=None):
+    return _run(_hash, password, rounds or Config.BCRYPT_LOG_ROUNDS)
+
+
+def check_password(password_hash, password):
+    if not password_hash:
+        return False
+    return _run(_check, password_hash, password)
@@ -1,80 +1,182 @@
-from boto3.dynamodb.conditions import Attr
-from db.dynamodb import provider_profiles_table, service_requests_table
+from db.repository import get_repository
+from utils.geo import (
+    UNLOCATED_CELL,
+    distance_km,
+    geocode,
+    geohash_encode,
+    item_location,
+)
 
 MAX_ACTIVE_JOBS = 3
 
 
 # -------------------------------------------------
-# COUNT ACTIVE JOBS (NO GSI → FULL SCAN)
+# COUNT ACTIVE JOBS (ProviderStats counter)
 # -------------------------------------------------
 def count_active_jobs(provider_id):
     """
     Counts accepted + in_progress jobs for a provider.
-    Uses scan because no GSI exists.
     """
 
-    res = service_requests_table.scan(
-        FilterExpression=Attr("assigned_provider_id").eq(provider_id)
-    )
-
-    count = 0
-    for item in res.get("Items", []):
-        if item["status"] in ["accepted", "in_progress"]:
-            count += 1
-
-    return count
+    return get_repository().get_active_jobs([provider_id])[provider_id]
 
 
 # -------------------------------------------------
 # ELIGIBLE PROVIDERS
 # -------------------------------------------------
-def get_eligible_providers(service_type, address):
+# One coarse read of the geohash index: the request's cell at
+# SEARCH_PRECISION (~1250 km x 625 km) plus the trade's unlocated
+# providers, ordered by distance in process (unlocated last).
+# Active-job counts are then read nearest-first, LOAD_BATCH at a
+# time, until MATCH_TARGET candidates have a free slot. When the
+# cell can't supply that many (sparse trade, request near a cell
+# edge) the whole service-type list is read instead; so is it
+# for requests without a location.
+SEARCH_PRECISION = 2
+MATCH_TARGET = 20
+
+# Provider ids per active-job read (one BatchGetItem)
+LOAD_BATCH = 100
+
+# Ranking: one free job slot is worth this many km of travel
+KM_PER_FREE_SLOT = 10
+
+
+def _by_distance(entries, location, exclude):
+    """(provider ids nearest first, unlocated last; their distances)"""
+    distances = {}
+    unlocated = []
+    seen = set(exclude)
+
+    for entry in entries:
+        pid = entry["provider_id"]
+        if pid in seen:
+            continue
+        seen.add(pid)
+
+        # Optional verification check
+        # if not entry.get("is_verified", False):
+        #     continue
+
+        point = item_location(entry) if "lat" in entry else None
+        if location is not None and point is not None:
+            distances[pid] = distance_km(location, point)
+        else:
+            unlocated.append(pid)
+
+    return sorted(distances, key=distances.get) + unlocated, distances
+
+
+def _load_nearest(candidates, active_jobs):
     """
-    Filters providers based on:
-    - service type
-    - active job load
+    Reads the active jobs of `candidates` into `active_jobs`
+    nearest-first (skipping ids already there) until MATCH_TARGET
+    are under capacity. Returns the candidates that were loaded.
     """
+    loaded = []
+    free = 0
 
-    eligible = []
+    for start in range(0, len(candidates), LOAD_BATCH):
+        chunk = candidates[start:start + LOAD_BATCH]
+        missing = [pid for pid in chunk if pid not in active_jobs]
+        if missing:
+            active_jobs.update(get_repository().get_active_jobs(missing))
 
-    res = provider_profiles_table.scan()
+        loaded.extend(chunk)
+        free += len(_under_capacity(chunk, active_jobs))
+        if free >= MATCH_TARGET:
+            break
 
-    for profile in res.get("Items", []):
+    return loaded
 
-        provider_id = profile["provider_id"]
 
-        # Optional verification check
-        # if not profile.get("is_verified", False):
-        #     continue
+def _candidates_with_load(service_type, location=None, exclude=()):
+    """
+    Providers offering `service_type` (nearest first, unlocated
+    last), their distances in km and their active-job counts.
+    Providers beyond the first MATCH_TARGET with a free slot may
+    be left out.
+    """
 
-        if service_type not in profile.get("service_types", []):
-            continue
+    repo = get_repository()
+    exclude = set(exclude)
+    active_jobs = {}
+
+    if location is not None:
+        cell = geohash_encode(*location)[:SEARCH_PRECISION]
+        candidates, distances = _by_distance(
+            repo.list_providers_near(service_type, [cell, UNLOCATED_CELL]),
+            location,
+            exclude,
+        )
+        loaded = _load_nearest(candidates, active_jobs)
+        if len(_under_capacity(loaded, active_jobs)) >= MATCH_TARGET:
+            return loaded, distances, active_jobs
+
+    candidates, distances = _by_distance(
+        repo.list_providers_for_service(service_type), location, exclude
+    )
+    return _load_nearest(candidates, active_jobs), distances, active_jobs
 
-        if count_active_jobs(provider_id) >= MAX_ACTIVE_JOBS:
-            continue
 
-        eligible.append(provider_id)
+def _under_capacity(candidates, active_jobs):
+    return [
+        pid for pid in candidates
+        if active_jobs[pid] < MAX_ACTIVE_JOBS
+    ]
 
-    return eligible
+
+def get_eligible_providers(service_type, address, location=None):
+    """
+    Filters providers based on:
+    - service type
+    - proximity to the address
+    - active job load
+    """
+
+    location = location or geocode(address)
+    candidates, _, active_jobs = _candidates_with_load(service_type, location)
+    return _under_capacity(candidates, active_jobs)
 
 
 # -------------------------------------------------
 # RANK PROVIDERS
 # -------------------------------------------------
-def rank_providers(provider_ids):
+def rank_providers(provider_ids, active_jobs=None, distances=None):
+    if active_jobs is None:
+        active_jobs = get_repository().get_active_jobs(provider_ids)
+    distances = distances or {}
+
+    # Unlocated providers are scored as the farthest known one and
+    # come after every located one
+    unknown_km = max(distances.values(), default=0)
+
     ranked = []
 
     for pid in provider_ids:
-        active_jobs = count_active_jobs(pid)
-        score = (MAX_ACTIVE_JOBS - active_jobs) * 10
-        ranked.append((pid, score))
-
-    return sorted(ranked, key=lambda x: x[1], reverse=True)
+        score = (MAX_ACTIVE_JOBS - active_jobs[pid]) * 10
+        km = distances.get(pid, unknown_km)
+        score -= km * 10 / KM_PER_FREE_SLOT
+        ranked.append((pid, round(score, 2)))
+
+    return sorted(
+        ranked,
+        key=lambda x: (bool(distances) and x[0] not in distances, -x[1]),
+    )
 
 
 # -------------------------------------------------
 # FINAL ENTRY POINT
 # -------------------------------------------------
-def get_ranked_providers(service_type, address):
-    eligible = get_eligible_providers(service_type, address)
-    return rank_providers(eligible)
+def get_ranked_providers(service_type, address, location=None, exclude=()):
+    """
+    location → stored (lat, lon) of the request; geocoded from
+               the address when missing
+    exclude  → provider ids already contacted for this request
+    """
+    location = location or geocode(address)
+    candidates, distances, active_jobs = _candidates_with_load(
+        service_type, location, exclude
+    )
+    eligible = _under_capacity(candidates, active_jobs)
+    return rank_providers(eligible, active_jobs, distances)
@@ -1,97 +1,230 @@
-from boto3.dynamodb.conditions import Key
-from db.dynamodb import service_requests_table, service_offers_table
-from utils.time_utils import now_iso
-from services.offer_service import offer_request_to_providers, MAX_OFFER_ROUNDS
+import threading
+
+from db.repository import ConditionFailed, get_repository
+from utils.time_utils import now_iso, now_epoch
+from services.offer_service import (
+    OfferWriteBatch,
+    offer_request_to_providers,
+    MAX_OFFER_ROUNDS,
+)
 from services.provider_matcher import get_ranked_providers
+from services.notifications import notify
+from utils.metrics import track_source
+from utils.geo import item_location
+
+
+# Longest the scheduler sleeps without re-checking the expiry
+# index (picks up offers created by other workers).
+MAX_IDLE_SECONDS = 60
+
+# Sleep after a failed pass (throttling, network errors, ...)
+ERROR_RETRY_SECONDS = 10
+
+# Single-flight: one expiry pass at a time per process
+_expiry_lock = threading.Lock()
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def is_offer_expired(request, now=None):
+    """Read-path check: offered and past its deadline."""
+    epoch = request.get("offer_expires_epoch")
+    return (
+        request.get("status") == "offered"
+        and epoch is not None
+        and epoch <= (now or now_epoch())
+    )
 
 
 def handle_expired_offers():
+    """
+    Processes offered requests whose deadline has passed.
+    Returns immediately (0) if a pass is already running.
+    """
+
+    if not _expiry_lock.acquire(blocking=False):
+        return 0
 
-    res = service_requests_table.scan()
+    try:
+        with track_source("cron.offer_expiry"):
+            return _process_due_offers()
+    finally:
+        _expiry_lock.release()
 
-    for request in res.get("Items", []):
+
+def _notify_expired(request_id):
+    notify(
+        subject="Service Request Expired",
+        message=(
+            f"No provider accepted in time\n\n"
+            f"Request ID: {request_id}\n"
+            f"Expired At (UTC): {now_iso()}"
+        )
+    )
+
+
+def _process_due_offers():
+    """
+    Reads only the due entries of the offer-expiry index.
+    """
+
+    repo = get_repository()
+    due = repo.list_due_requests(now_epoch())
+
+    for request in due:
 
         if request["status"] != "offered":
             continue
 
-        if (
-            not request.get("offer_expires_at")
-            or request["offer_expires_at"] >= now_iso()
-        ):
+        try:
+            _close_out_round(repo, request)
+        except ConditionFailed:
+            # Accepted, cancelled or handled by another process
+            # since it was read: that write won, skip it
             continue
+        except Exception as e:
+            print(f"Offer expiry failed for {request['request_id']}:", e)
+
+    return len(due)
+
+
+def _close_out_round(repo, request):
+    """
+    Expires the open offers of a due request, then re-offers it or
+    closes it. Every request write is conditioned on the round that
+    was read (status offered, same round and deadline), so two
+    processes running the expiry worker never both act on one round.
+    """
+
+    request_id = request["request_id"]
+    expected = {
+        "status": "offered",
+        "offer_round": request["offer_round"],
+        "offer_expires_epoch": request["offer_expires_epoch"],
+    }
+
+    # All writes for this request go out in one transaction
+    batch = OfferWriteBatch()
+
+    # -------------------------------------------------
+    # 1️⃣ Expire all open offers
+    # -------------------------------------------------
+    offers = repo.list_offers_for_request(request_id)
 
-        request_id = request["request_id"]
-
-        # -------------------------------------------------
-        # 1️⃣ Expire all open offers
-        # -------------------------------------------------
-        offers = service_offers_table.query(
-            KeyConditionExpression=Key("request_id").eq(request_id)
-        ).get("Items", [])
-
-        for offer in offers:
-            if offer["status"] == "offered":
-                service_offers_table.update_item(
-                    Key={
-                        "request_id": request_id,
-                        "provider_id": offer["provider_id"]
-                    },
-                    UpdateExpression="SET #s = :expired",
-                    ExpressionAttributeNames={"#s": "status"},
-                    ExpressionAttributeValues={":expired": "expired"}
-                )
-
-        # -------------------------------------------------
-        # 2️⃣ Max rounds check
-        # -------------------------------------------------
-        if request["offer_round"] >= MAX_OFFER_ROUNDS:
-            service_requests_table.update_item(
-                Key={"request_id": request_id},
-                UpdateExpression="SET #s = :expired, updated_at = :now",
-                ExpressionAttributeNames={"#s": "status"},
-                ExpressionAttributeValues={
-                    ":expired": "expired",
-                    ":now": now_iso()
-                }
+    for offer in offers:
+        if offer["status"] == "offered":
+            batch.set_offer_status(
+                request_id, offer["provider_id"], "expired"
             )
-            continue
 
-        # -------------------------------------------------
-        # 3️⃣ Exclude previously contacted providers
-        # -------------------------------------------------
-        previously_contacted = {
-            o["provider_id"] for o in offers
-        }
+    # -------------------------------------------------
+    # 2️⃣ Max rounds check
+    # -------------------------------------------------
+    if request["offer_round"] >= MAX_OFFER_ROUNDS:
+        _expire_request(batch, request, expected)
+        return
 
-        ranked = get_ranked_providers(
-            request["service_type"],
-            request["address"]
-        )
+    # -------------------------------------------------
+    # 3️⃣ Exclude previously contacted providers
+    # -------------------------------------------------
+    previously_contacted = {
+        o["provider_id"] for o in offers
+    }
+
+    ranked = get_ranked_providers(
+        request["service_type"],
+        request["address"],
+        location=item_location(request),
+        exclude=previously_contacted,
+    )
+
+    fresh_providers = [
+        pid for pid, _ in ranked
+        if pid not in previously_contacted
+    ]
+
+    # -------------------------------------------------
+    # 4️⃣ No providers left → expire
+    # -------------------------------------------------
+    if not fresh_providers:
+        _expire_request(batch, request, expected)
+        return
+
+    # -------------------------------------------------
+    # 5️⃣ Re-offer next batch
+    # -------------------------------------------------
+    offer_request_to_providers(
+        request,
+        fresh_providers[:3],
+        batch,
+        expected=expected,
+    )
+
+
+def _expire_request(batch, request, expected):
+    batch.update_request(
+        request["request_id"],
+        {"status": "expired", "updated_at": now_iso()},
+        expected=expected,
+    )
+    batch.request_changed(request, "expired")
+    batch.commit()
+    _notify_expired(request["request_id"])
+
+
+# -------------------------------------------------
+# PRECISE-WAKEUP SCHEDULER
+# -------------------------------------------------
+def seconds_until_next_expiry():
+    with track_source("cron.offer_expiry"):
+        next_expiry = get_repository().next_offer_expiry()
+    if next_expiry is None:
+        return MAX_IDLE_SECONDS
+    return min(max(next_expiry - now_epoch(), 1), MAX_IDLE_SECONDS)
 
-        fresh_providers = [
-            pid for pid, _ in ranked
-            if pid not in previously_contacted
-        ]
-
-        # -------------------------------------------------
-        # 4️⃣ No providers left → expire
-        # -------------------------------------------------
-        if not fresh_providers:
-            service_requests_table.update_item(
-                Key={"request_id": request_id},
-                UpdateExpression="SET #s = :expired, updated_at = :now",
-                ExpressionAttributeNames={"#s": "status"},
-                ExpressionAttributeValues={
-                    ":expired": "expired",
-                    ":now": now_iso()
-                }
+
+def run_expiry_scheduler(stop_event=None):
+    """
+    Handles due offers, then sleeps until the next deadline
+    (capped at MAX_IDLE_SECONDS) or until `stop_event` is set.
+    """
+
+    stop_event = stop_event or threading.Event()
+
+    while not stop_event.is_set():
+        # A failed pass must not end the thread: offers would never
+        # expire in this process again
+        try:
+            processed = handle_expired_offers()
+            if processed:
+                print(f"Expired offers processed: {processed}")
+            delay = seconds_until_next_expiry()
+        except Exception as e:
+            print("Offer expiry pass failed:", e)
+            delay = ERROR_RETRY_SECONDS
+
+        stop_event.wait(delay)
+
+
+def start_expiry_worker():
+    """
+    Runs the scheduler on a daemon thread, once per process.
+    Returns the thread's stop event.
+    """
+
+    global _worker
+
+    with _worker_lock:
+        if _worker is None:
+            stop_event = threading.Event()
+            thread = threading.Thread(
+                target=run_expiry_scheduler,
+                args=(stop_event,),
+                name="offer-expiry",
+                daemon=True,
             )
-            continue
+            thread.start()
+            _worker = (thread, stop_event)
 
-        # -------------------------------------------------
-        # 5️⃣ Re-offer next batch
-        # -------------------------------------------------
-        offer_request_to_providers(
-            request,
-            fresh_providers[:3]
-        )
+        return _worker[1]
@@ -0,0 +1,78 @@
+import os
+import threading
+
+import boto3
+from botocore.config import Config as BotoConfig
+
+from config import Config
+from utils.metrics import install_dynamodb_hooks
+
+
+# ----------------------------------
+# Shared, per-process AWS clients
+# ----------------------------------
+# One boto3 session + one client/resource per service, built on
+# first use. botocore's connection pool and sockets must not be
+# shared with forked children, so everything is rebuilt when the
+# PID changes (pre-fork servers import the app once, then fork).
+
+_lock = threading.Lock()
+_pid = None
+_session = None
+_clients = {}
+_resources = {}
+
+
+def botocore_config():
+    return BotoConfig(
+        region_name=Config.AWS_REGION,
+        max_pool_connections=Config.AWS_MAX_POOL_CONNECTIONS,
+        connect_timeout=Config.AWS_CONNECT_TIMEOUT,
+        read_timeout=Config.AWS_READ_TIMEOUT,
+        retries={
+            "mode": "adaptive",
+            "total_max_attempts": Config.AWS_MAX_ATTEMPTS,
+        },
+        tcp_keepalive=True,
+    )
+
+
+def _reset_if_forked():
+    global _pid, _session, _clients, _resources
+
+    if _pid != os.getpid():
+        _session = boto3.session.Session(region_name=Config.AWS_REGION)
+        # Copied into every client built from this session
+        install_dynamodb_hooks(_session.events)
+        _clients = {}
+        _resources = {}
+        _pid = os.getpid()
+
+
+def get_client(service):
+    client = _clients.get(service) if _pid == os.getpid() else None
+    if client is not None:
+        return client
+
+    with _lock:
+        _reset_if_forked()
+        if service not in _clients:
+            _clients[service] = _session.client(
+                service, config=botocore_config()
+            )
+        return _clients[service]
+
+
+def get_resource(service):
+    resource = _resources.get(service) if _pid == os.getpid() else None
+    if resource is not None:
+        return resource
+
+    with _lock:
+        _reset_if_forked()
+        if service not in _resources:
+            resource = _session.resource(service, config=botocore_config())
+            _resources[service] = resource
+            # Share the resource's connection pool with get_client()
+            _clients.setdefault(service, resource.meta.client)
+        return _resources[service]
@@ -0,0 +1,44 @@
+import zlib
+
+from flask import current_app, request
+
+from db.repository import get_repository
+
+
+# ----------------------------------
+# Conditional GET on per-user listings
+# ----------------------------------
+# Every write that changes a user's requests / offers / jobs
+# bumps their change version (OfferWriteBatch.touch). The ETag
+# of a listing is that version plus a hash of the URL (fields,
+# cursor, ...) and of the user, so a poll carrying the current
+# ETag in If-None-Match costs one point read of the version and
+# never touches ServiceRequests / ServiceOffers.
+
+def listing_etag(user_id):
+    version = get_repository().get_change_version(user_id)
+    variant = zlib.crc32(f"{user_id} {request.full_path}".encode())
+    return f"{version}-{variant:08x}"
+
+
+def versioned_listing(user_id, build):
+    """
+    304 when If-None-Match holds the current ETag, else the
+    response of `build()` with the ETag attached.
+
+    The version is read before `build()` runs: a write landing in
+    between leaves newer data under an older ETag, which the next
+    poll simply refetches.
+    """
+    etag = listing_etag(user_id)
+
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.make_response(build())
+        if response.status_code != 200:
+            return response
+
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
@@ -0,0 +1,175 @@
+import math
+import re
+from decimal import Decimal
+from functools import lru_cache
+
+
+# ==========================================================
+# GEOHASH
+# ==========================================================
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {c: i for i, c in enumerate(_BASE32)}
+
+# Stored precision; ~1.2 km x 0.6 km cells
+GEOHASH_PRECISION = 6
+
+# Geohash index key of providers without a location: not a
+# geohash character, so no cell prefix ever matches it
+UNLOCATED_CELL = "-"
+
+
+def geohash_encode(lat, lon, precision=GEOHASH_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        rng, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+def geohash_bounds(geohash):
+    """(lat_min, lat_max, lon_min, lon_max) of the cell."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+
+    for char in geohash:
+        value = _DECODE[char]
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (value >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+
+    return lat_range[0], lat_range[1], lon_range[0], lon_range[1]
+
+
+def distance_km(a, b):
+    """Great-circle distance between two (lat, lon) points."""
+    lat1, lon1 = map(math.radians, a)
+    lat2, lon2 = map(math.radians, b)
+    h = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * 6371.0 * math.asin(math.sqrt(h))
+
+
+# ==========================================================
+# OFFLINE GEOCODER (stand-in)
+# ==========================================================
+# No network calls. In order:
+#   1. explicit coordinates in the address ("... @ 40.71,-74.00")
+#   2. a known city name (small built-in gazetteer)
+# Anything else is unlocated (None): matching then falls back to
+# the whole service-type list rather than trusting a made-up point.
+# Replace geocode() with a real geocoder when one is available.
+
+CITY_COORDINATES = {
+    "new york": (40.7128, -74.0060),
+    "los angeles": (34.0522, -118.2437),
+    "chicago": (41.8781, -87.6298),
+    "houston": (29.7604, -95.3698),
+    "phoenix": (33.4484, -112.0740),
+    "philadelphia": (39.9526, -75.1652),
+    "san antonio": (29.4241, -98.4936),
+    "san diego": (32.7157, -117.1611),
+    "dallas": (32.7767, -96.7970),
+    "san francisco": (37.7749, -122.4194),
+    "seattle": (47.6062, -122.3321),
+    "boston": (42.3601, -71.0589),
+    "miami": (25.7617, -80.1918),
+    "atlanta": (33.7490, -84.3880),
+    "denver": (39.7392, -104.9903),
+    "mumbai": (19.0760, 72.8777),
+    "delhi": (28.7041, 77.1025),
+    "new delhi": (28.6139, 77.2090),
+    "bengaluru": (12.9716, 77.5946),
+    "bangalore": (12.9716, 77.5946),
+    "hyderabad": (17.3850, 78.4867),
+    "chennai": (13.0827, 80.2707),
+    "kolkata": (22.5726, 88.3639),
+    "pune": (18.5204, 73.8567),
+    "ahmedabad": (23.0225, 72.5714),
+    "jaipur": (26.9124, 75.7873),
+    "lucknow": (26.8467, 80.9462),
+    "london": (51.5074, -0.1278),
+    "toronto": (43.6532, -79.3832),
+}
+
+_COORDINATES = re.compile(r"(-?\d{1,2}\.\d+)\s*,\s*(-?\d{1,3}\.\d+)")
+
+
+def _normalize(address):
+    return re.sub(r"\s+", " ", address.strip().lower())
+
+
+@lru_cache(maxsize=10000)
+def geocode(address):
+    """(lat, lon) for an address, or None if it can't be placed."""
+    if not address or not address.strip():
+        return None
+
+    match = _COORDINATES.search(address)
+    if match:
+        lat, lon = float(match.group(1)), float(match.group(2))
+        if -90 <= lat <= 90 and -180 <= lon <= 180:
+            return lat, lon
+
+    normalized = _normalize(address)
+    parts = [p.strip() for p in normalized.split(",") if p.strip()]
+
+    for part in reversed(parts):
+        city = re.sub(r"[^a-z ]", "", part).strip()
+        if city in CITY_COORDINATES:
+            return CITY_COORDINATES[city]
+
+    return None
+
+
+# ==========================================================
+# STORED LOCATION FIELDS
+# ==========================================================
+def location_fields(address):
+    """
+    lat / lon / geohash attributes for an item (Decimal: DynamoDB
+    does not take floats). Empty if the address can't be placed.
+    """
+    point = geocode(address)
+    if point is None:
+        return {}
+    lat, lon = point
+    return {
+        "lat": Decimal(str(round(lat, 6))),
+        "lon": Decimal(str(round(lon, 6))),
+        "geohash": geohash_encode(lat, lon),
+    }
+
+
+def item_location(item):
+    """(lat, lon) stored on an item, else geocoded from its address."""
+    if item.get("lat") is not None and item.get("lon") is not None:
+        return float(item["lat"]), float(item["lon"])
+    return geocode(item.get("address") or "")
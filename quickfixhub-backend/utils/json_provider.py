@@ -0,0 +1,109 @@
+import dataclasses
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from uuid import UUID
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+# ----------------------------------
+# App JSON provider
+# ----------------------------------
+# Replaces Flask's default provider (app.json). Encodes with
+# orjson when it is installed, else with the stdlib encoder, and
+# both handle the types storage hands back natively:
+#   Decimal         → int / float (DynamoDB numbers)
+#   datetime / date → ISO 8601
+#   set             → list (DynamoDB string sets)
+#
+# JSON_ENCODER: "auto" (orjson if available) | "orjson" | "stdlib"
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, UUID):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def resolve_encoder(name):
+    if name == "auto":
+        return "orjson" if orjson is not None else "stdlib"
+    if name == "orjson" and orjson is None:
+        raise RuntimeError("JSON_ENCODER=orjson but orjson is not installed")
+    if name not in ("orjson", "stdlib"):
+        raise ValueError(f"Unknown JSON encoder: {name}")
+    return name
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Key order follows the response dicts (the models' field
+    order) instead of being sorted: sorting costs more than the
+    encoding itself on large lists.
+    """
+
+    sort_keys = False
+
+    def __init__(self, app, encoder="auto"):
+        super().__init__(app)
+        self.encoder = resolve_encoder(encoder)
+
+    def _pretty(self):
+        return self.compact is False or (self.compact is None and self._app.debug)
+
+    def encode(self, obj):
+        """UTF-8 JSON bytes for `obj`."""
+        pretty = self._pretty()
+
+        if self.encoder == "orjson":
+            option = orjson.OPT_NON_STR_KEYS
+            if pretty:
+                option |= orjson.OPT_INDENT_2
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            try:
+                return orjson.dumps(obj, default=_default, option=option)
+            except TypeError:
+                # e.g. integers beyond 64 bits: the stdlib copes
+                pass
+
+        return json.dumps(
+            obj,
+            default=_default,
+            ensure_ascii=False,
+            sort_keys=self.sort_keys,
+            indent=2 if pretty else None,
+            separators=None if pretty else (",", ":"),
+        ).encode()
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            kwargs.setdefault("default", _default)
+            return json.dumps(obj, **kwargs)
+        return self.encode(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if self.encoder == "orjson" and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            self.encode(obj) + b"\n", mimetype=self.mimetype
+        )
@@ -0,0 +1,285 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+
+# ----------------------------------
+# DynamoDB call metrics (botocore event hooks)
+# ----------------------------------
+# Every DynamoDB API call made through utils/aws.py is recorded
+# with its operation, table, latency, items scanned / returned
+# and consumed capacity. Calls are attributed to a "source":
+#   - the Flask endpoint ("provider.available_jobs") inside a request
+#   - the name given to track_source() (e.g. the expiry cron tick)
+#   - "background" otherwise
+#
+# Aggregates live in this process and are served by /api/metrics.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Operations that accept ReturnConsumedCapacity
+CAPACITY_OPERATIONS = {
+    "GetItem", "PutItem", "UpdateItem", "DeleteItem",
+    "Query", "Scan",
+    "BatchGetItem", "BatchWriteItem",
+    "TransactGetItems", "TransactWriteItems",
+}
+
+_local = threading.local()
+
+
+class CallStats:
+
+    __slots__ = (
+        "calls", "errors", "latency_total", "buckets",
+        "scanned", "returned", "capacity",
+    )
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency_total = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.scanned = 0
+        self.returned = 0
+        self.capacity = 0.0
+
+    def add(self, latency, scanned, returned, capacity, error):
+        self.calls += 1
+        self.errors += int(error)
+        self.latency_total += latency
+        self.scanned += scanned
+        self.returned += returned
+        self.capacity += capacity
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                self.buckets[i] += 1
+
+
+class DynamoMetrics:
+    """(source, operation, table) → CallStats, thread-safe."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def record(self, source, operation, table, **values):
+        key = (source, operation, table)
+        with self.lock:
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = self.stats[key] = CallStats()
+            stats.add(**values)
+
+    def reset(self):
+        with self.lock:
+            self.stats = {}
+
+    def snapshot(self):
+        with self.lock:
+            return sorted(self.stats.items())
+
+
+dynamo_metrics = DynamoMetrics()
+
+
+# ----------------------------------
+# Attribution
+# ----------------------------------
+@contextmanager
+def track_source(name):
+    """Attributes DynamoDB calls on this thread to `name`."""
+    previous = getattr(_local, "source", None)
+    _local.source = name
+    try:
+        yield
+    finally:
+        _local.source = previous
+
+
+def current_source():
+    if has_request_context():
+        return request.endpoint or "unmatched"
+    return getattr(_local, "source", None) or "background"
+
+
+# ----------------------------------
+# Reading the call
+# ----------------------------------
+def _table_name(params):
+    if "TableName" in params:
+        return params["TableName"]
+    if "RequestItems" in params:
+        return "+".join(sorted(params["RequestItems"]))
+    if "TransactItems" in params:
+        tables = {
+            action["TableName"]
+            for item in params["TransactItems"]
+            for action in item.values()
+        }
+        return "+".join(sorted(tables))
+    return ""
+
+
+def _item_counts(parsed):
+    """(scanned, returned) for the response."""
+    if "Count" in parsed:
+        return parsed.get("ScannedCount", parsed["Count"]), parsed["Count"]
+    if "Responses" in parsed:
+        responses = parsed["Responses"]
+        if isinstance(responses, dict):
+            returned = sum(len(items) for items in responses.values())
+        else:
+            returned = sum(1 for r in responses if r.get("Item"))
+        return returned, returned
+    if parsed.get("Item"):
+        return 1, 1
+    return 0, 0
+
+
+def _capacity(parsed):
+    consumed = parsed.get("ConsumedCapacity")
+    if not consumed:
+        return 0.0
+    if isinstance(consumed, dict):
+        consumed = [consumed]
+    return float(sum(c.get("CapacityUnits", 0) for c in consumed))
+
+
+# ----------------------------------
+# botocore event handlers
+# ----------------------------------
+def _before_call(params, model, context, **kwargs):
+    # provide-client-params: sees the API params before serialization
+    if model.name in CAPACITY_OPERATIONS:
+        params.setdefault("ReturnConsumedCapacity", "TOTAL")
+
+    context["metrics_started"] = time.perf_counter()
+    context["metrics_table"] = _table_name(params)
+
+
+def _after_call(http_response, parsed, model, context, **kwargs):
+    started = context.get("metrics_started")
+    if started is None:
+        return
+
+    latency = time.perf_counter() - started
+    scanned, returned = _item_counts(parsed)
+    capacity = _capacity(parsed)
+    error = http_response.status_code >= 400 or "Error" in parsed
+    source = current_source()
+
+    dynamo_metrics.record(
+        source,
+        model.name,
+        context["metrics_table"],
+        latency=latency,
+        scanned=scanned,
+        returned=returned,
+        capacity=capacity,
+        error=error,
+    )
+
+    if has_request_context():
+        calls = g.setdefault("dynamodb_calls", [])
+        calls.append((model.name, latency, scanned, returned, capacity))
+
+
+def _after_call_error(exception, context, event_name, **kwargs):
+    # Connection / timeout errors never reach after-call
+    started = context.get("metrics_started")
+    if started is None:
+        return
+
+    dynamo_metrics.record(
+        current_source(),
+        event_name.rsplit(".", 1)[-1],
+        context["metrics_table"],
+        latency=time.perf_counter() - started,
+        scanned=0,
+        returned=0,
+        capacity=0.0,
+        error=True,
+    )
+
+
+def install_dynamodb_hooks(events):
+    """Registers the handlers on a botocore event emitter (session-wide)."""
+    events.register("provide-client-params.dynamodb", _before_call)
+    events.register("after-call.dynamodb", _after_call)
+    events.register("after-call-error.dynamodb", _after_call_error)
+
+
+# ----------------------------------
+# Per-request debug header
+# ----------------------------------
+DEBUG_HEADER = "X-DynamoDB-Calls"
+
+
+def request_summary():
+    """'calls=3; ms=12.4; scanned=40; returned=3; cu=1.5; ops=GetItem:1,Query:2'"""
+    calls = g.get("dynamodb_calls", [])
+    ops = {}
+    for operation, *_ in calls:
+        ops[operation] = ops.get(operation, 0) + 1
+
+    return (
+        f"calls={len(calls)}; "
+        f"ms={sum(c[1] for c in calls) * 1000:.1f}; "
+        f"scanned={sum(c[2] for c in calls)}; "
+        f"returned={sum(c[3] for c in calls)}; "
+        f"cu={sum(c[4] for c in calls):g}; "
+        f"ops={','.join(f'{op}:{n}' for op, n in sorted(ops.items()))}"
+    )
+
+
+def add_debug_header(response):
+    response.headers[DEBUG_HEADER] = request_summary()
+    return response
+
+
+# ----------------------------------
+# Prometheus text format
+# ----------------------------------
+def _labels(source, operation, table):
+    def esc(value):
+        return value.replace("\\", "\\\\").replace('"', '\\"')
+    return (
+        f'source="{esc(source)}",operation="{esc(operation)}",'
+        f'table="{esc(table)}"'
+    )
+
+
+def prometheus_text():
+    snapshot = dynamo_metrics.snapshot()
+    lines = []
+
+    counters = [
+        ("requests_total", "DynamoDB API calls.", lambda s: s.calls),
+        ("errors_total", "DynamoDB API calls that failed.", lambda s: s.errors),
+        ("items_scanned_total", "Items read by DynamoDB (ScannedCount).", lambda s: s.scanned),
+        ("items_returned_total", "Items returned to the app.", lambda s: s.returned),
+        ("consumed_capacity_units_total", "Consumed capacity units.", lambda s: s.capacity),
+    ]
+
+    for name, help_text, value in counters:
+        metric = f"quickfixhub_dynamodb_{name}"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        for key, stats in snapshot:
+            lines.append(f"{metric}{{{_labels(*key)}}} {value(stats):g}")
+
+    metric = "quickfixhub_dynamodb_latency_seconds"
+    lines.append(f"# HELP {metric} DynamoDB API call latency, retries included.")
+    lines.append(f"# TYPE {metric} histogram")
+    for key, stats in snapshot:
+        labels = _labels(*key)
+        for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+            lines.append(f'{metric}_bucket{{{labels},le="{bound:g}"}} {count}')
+        lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {stats.calls}')
+        lines.append(f"{metric}_sum{{{labels}}} {stats.latency_total:.6f}")
+        lines.append(f"{metric}_count{{{labels}}} {stats.calls}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,155 @@
+import base64
+import binascii
+import itertools
+import json
+
+from flask import Response, current_app, request, stream_with_context
+
+from db.repository import InvalidStartKey
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+class InvalidPageArgs(ValueError):
+    pass
+
+
+# ----------------------------------
+# Opaque continuation tokens
+# ----------------------------------
+def encode_cursor(start_key):
+    if start_key is None:
+        return None
+    raw = json.dumps(start_key, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, binascii.Error):
+        raise InvalidPageArgs("Invalid cursor")
+
+
+def _limit_arg(default):
+    raw = request.args.get("limit")
+    if raw is None:
+        return default
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise InvalidPageArgs("limit must be an integer")
+    if limit < 1:
+        raise InvalidPageArgs("limit must be positive")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+# ----------------------------------
+# Field selection (?fields=)
+# ----------------------------------
+def fields_arg(model, required=()):
+    """
+    ?fields= on a list endpoint → (fields, item_keys) for
+    model.to_dict(fields) and the repository's `attributes`:
+
+      (absent) / all  → (None, None): every field, whole items
+      summary         → model.SUMMARY_FIELDS
+      a,b,c           → those API fields (camelCase)
+
+    `required` storage attributes are read as well (the route
+    itself needs them).
+    """
+    raw = request.args.get("fields")
+    if raw is None or raw == "all":
+        return None, None
+
+    if raw == "summary":
+        names = model.SUMMARY_FIELDS
+    else:
+        names = [name.strip() for name in raw.split(",") if name.strip()]
+
+    if not names:
+        raise InvalidPageArgs("fields must not be empty")
+
+    try:
+        fields, item_keys = model.select(names)
+    except KeyError as e:
+        raise InvalidPageArgs(f"Unknown field: {e.args[0]}")
+
+    return fields, list(dict.fromkeys([*item_keys, *required]))
+
+
+# ----------------------------------
+# List endpoint responses
+# ----------------------------------
+def paged_response(fetch_page, key, transform=None, default_limit=DEFAULT_PAGE_SIZE):
+    """
+    Serves a list endpoint from `fetch_page(limit, start_key)`,
+    which returns (items, next_start_key).
+
+      ?limit=N&cursor=T  → one page + "nextCursor"
+      ?stream=ndjson     → all pages, one item per line, sent
+                           as each page arrives from storage
+
+    default_limit=None keeps the old "whole list" behaviour
+    when no limit/cursor is given.
+    """
+
+    try:
+        start_key = decode_cursor(request.args.get("cursor"))
+        limit = _limit_arg(default_limit)
+    except InvalidPageArgs as e:
+        return {"success": False, "message": str(e)}, 400
+
+    transform = transform or (lambda item: item)
+
+    try:
+        if request.args.get("stream") == "ndjson":
+            return _ndjson_response(fetch_page, transform, start_key)
+
+        if limit is None and start_key is None:
+            items = []
+            for page in _iter_pages(fetch_page, None):
+                items.extend(transform(item) for item in page)
+            return {"success": True, key: items}
+
+        items, next_key = fetch_page(limit or DEFAULT_PAGE_SIZE, start_key)
+    except InvalidStartKey:
+        # Decodes fine but is not a key the backend issued
+        return {"success": False, "message": "Invalid cursor"}, 400
+
+    return {
+        "success": True,
+        key: [transform(item) for item in items],
+        "nextCursor": encode_cursor(next_key),
+    }
+
+
+def _iter_pages(fetch_page, start_key):
+    while True:
+        items, start_key = fetch_page(MAX_PAGE_SIZE, start_key)
+        yield items
+        if start_key is None:
+            return
+
+
+def _ndjson_response(fetch_page, transform, start_key):
+    dumps = current_app.json.dumps
+
+    # First page before the response starts: a bad cursor is
+    # still a 400, not a broken stream
+    pages = _iter_pages(fetch_page, start_key)
+    first = next(pages)
+
+    def generate():
+        for page in itertools.chain([first], pages):
+            yield "".join(dumps(transform(item)) + "\n" for item in page)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="application/x-ndjson"
+    )
@@ -0,0 +1,106 @@
+import threading
+import time
+
+from flask import current_app, stream_with_context
+
+from db.repository import get_repository
+from services.events import get_event_bus
+
+
+# ----------------------------------
+# Server-Sent Events stream
+# ----------------------------------
+# One text/event-stream response per open EventSource. Events:
+#   ready   → {"version": n}, the user's listing change version
+#   resync  → events were dropped; refetch the listings
+#   request.updated / job.updated / offer.created / offer.updated
+#             → {"requestId", "status"} (services/offer_service.py)
+# plus a comment line every SSE_HEARTBEAT_SECONDS so proxies
+# keep the connection open.
+#
+# Each stream holds a worker thread for up to SSE_MAX_STREAM_SECONDS,
+# so at most SSE_MAX_STREAMS are open per process; past that the
+# endpoint answers 503 + Retry-After and clients keep polling.
+
+RETRY_MS = 3000
+
+# Retry-After of a 503 when every stream slot is taken
+STREAMS_FULL_RETRY_SECONDS = 30
+
+_open_streams = 0
+_streams_lock = threading.Lock()
+
+
+def _reserve_stream(limit):
+    global _open_streams
+    with _streams_lock:
+        if _open_streams >= limit:
+            return False
+        _open_streams += 1
+        return True
+
+
+def _release_stream():
+    global _open_streams
+    with _streams_lock:
+        _open_streams -= 1
+
+
+def format_event(event, data):
+    # Compact even in debug: one data line per event
+    data = current_app.json.dumps(data, separators=(",", ":"))
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+def event_stream(user_id):
+    config = current_app.config
+    heartbeat = config["SSE_HEARTBEAT_SECONDS"]
+    max_seconds = config["SSE_MAX_STREAM_SECONDS"]
+
+    if not _reserve_stream(config["SSE_MAX_STREAMS"]):
+        return (
+            {"success": False, "message": "Too many open event streams"},
+            503,
+            {"Retry-After": str(STREAMS_FULL_RETRY_SECONDS)},
+        )
+
+    def generate():
+        bus = get_event_bus()
+        # Subscribe before reading the version: nothing falls in between
+        sub = bus.subscribe(user_id)
+        try:
+            version = get_repository().get_change_version(user_id)
+            yield f"retry: {RETRY_MS}\n\n"
+            yield format_event("ready", {"version": version})
+
+            deadline = time.monotonic() + max_seconds
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+
+                item = sub.get(timeout=min(heartbeat, remaining))
+
+                if sub.overflowed:
+                    sub.reset()
+                    yield format_event("resync", {})
+                elif item is None:
+                    yield ": heartbeat\n\n"
+                else:
+                    yield format_event(*item)
+        finally:
+            bus.unsubscribe(sub)
+
+    response = current_app.response_class(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # nginx / ALB-side buffering would hold events back
+            "X-Accel-Buffering": "no",
+        },
+    )
+    # The server closes the response even if the client left
+    # before the first byte (when generate() never ran)
+    response.call_on_close(_release_stream)
+    return response
@@ -0,0 +1,168 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+
+# Vite writes bundles to assets/ as "<name>-<8+ char hash>.<ext>"
+# → never change. Elsewhere (public/) names like apple-touch-icon.png
+# match the pattern too, so only assets/ is trusted.
+ASSETS_DIR = "assets/"
+HASHED_NAME = re.compile(r"-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+SHORT_LIVED = "public, max-age=3600"
+REVALIDATE = "no-cache"
+
+# Below this size compression is not worth the extra header bytes
+MIN_COMPRESS_SIZE = 1024
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/javascript",
+    "application/json",
+    "image/svg+xml",
+)
+
+
+class StaticAsset:
+    """One file of the React build, fully prepared in memory."""
+
+    def __init__(self, path, body, cache_control):
+        self.path = path
+        self.mimetype = (
+            mimetypes.guess_type(path)[0] or "application/octet-stream"
+        )
+        self.cache_control = cache_control
+
+        digest = hashlib.sha256(body).hexdigest()[:20]
+        self.etag = digest
+
+        # encoding → (body, etag); identity is always present
+        self.variants = {"identity": (body, digest)}
+
+        if len(body) >= MIN_COMPRESS_SIZE and self.mimetype.startswith(
+            COMPRESSIBLE_TYPES
+        ):
+            self._add_variant("gzip", gzip.compress(body, 9, mtime=0))
+            if brotli is not None:
+                self._add_variant("br", brotli.compress(body, quality=11))
+
+    def _add_variant(self, encoding, body):
+        if len(body) < len(self.variants["identity"][0]):
+            self.variants[encoding] = (body, f"{self.etag}-{encoding}")
+
+    @property
+    def size(self):
+        return len(self.variants["identity"][0])
+
+    def choose_encoding(self, accept_encodings):
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and accept_encodings[encoding]:
+                return encoding
+        return "identity"
+
+    def response(self):
+        encoding = self.choose_encoding(request.accept_encodings)
+        body, etag = self.variants[encoding]
+
+        headers = {
+            "Cache-Control": self.cache_control,
+            "ETag": f'"{etag}"',
+        }
+        if len(self.variants) > 1:
+            headers["Vary"] = "Accept-Encoding"
+
+        # Any variant's tag means the client holds this exact file
+        if any(
+            request.if_none_match.contains(tag)
+            for _, tag in self.variants.values()
+        ):
+            return Response(status=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+
+        return Response(body, headers=headers, mimetype=self.mimetype)
+
+
+class AssetManifest:
+    """
+    Path → StaticAsset for everything under `root`, built once at
+    startup. Requests never touch the filesystem afterwards.
+
+    Precompressed "<file>.gz" / "<file>.br" written by the build are
+    used as-is instead of compressing again.
+    """
+
+    def __init__(self, root, index="index.html"):
+        self.root = root
+        self.index = index
+        self.assets = {}
+
+        if os.path.isdir(root):
+            self._load()
+
+    def _load(self):
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                if name.endswith((".gz", ".br")):
+                    continue
+
+                full_path = os.path.join(directory, name)
+                path = os.path.relpath(full_path, self.root).replace(os.sep, "/")
+
+                with open(full_path, "rb") as f:
+                    asset = StaticAsset(path, f.read(), self._cache_control(path))
+
+                for encoding, suffix in (("gzip", ".gz"), ("br", ".br")):
+                    if os.path.exists(full_path + suffix):
+                        with open(full_path + suffix, "rb") as f:
+                            asset._add_variant(encoding, f.read())
+
+                self.assets[path] = asset
+
+    def _cache_control(self, path):
+        if path == self.index:
+            # Points at the current bundle names → always revalidate
+            return REVALIDATE
+        if path.startswith(ASSETS_DIR) and HASHED_NAME.search(path):
+            return IMMUTABLE
+        return SHORT_LIVED
+
+    def __len__(self):
+        return len(self.assets)
+
+    def get(self, path):
+        return self.assets.get(path)
+
+    def stats(self):
+        return {
+            "files": len(self.assets),
+            "bytes": sum(asset.size for asset in self.assets.values()),
+            "compressed": sum(
+                len(asset.variants) > 1 for asset in self.assets.values()
+            ),
+        }
+
+    def serve(self, path):
+        """
+        The file at `path`, else the SPA shell (React Router paths).
+        Missing files under assets/ are a real 404, not HTML.
+        """
+        asset = self.assets.get(path)
+        if asset is not None:
+            return asset.response()
+
+        if path.startswith(ASSETS_DIR) or self.index not in self.assets:
+            return Response("Not Found", status=404, mimetype="text/plain")
+
+        return self.assets[self.index].response()
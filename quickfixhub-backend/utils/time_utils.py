@@ -1,4 +1,16 @@
-from datetime import datetime
+import math
+import time
+from datetime import datetime, timezone
 
 def now_iso():
     return datetime.utcnow().isoformat()
+
+def now_epoch():
+    return int(time.time())
+
+def to_epoch(iso):
+    """ISO timestamp → epoch seconds (rounded up). Naive means UTC."""
+    dt = datetime.fromisoformat(iso)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return math.ceil(dt.timestamp())